@@ -0,0 +1,79 @@
+import os
+import json
+import time
+import threading
+from dotenv import load_dotenv
+from nessie_client import get_client
+load_dotenv()
+
+# --- Config (overridable through .env) ---
+ACCOUNT_CACHE_TTL = float(os.getenv("ACCOUNT_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+ACCOUNT_CACHE_PATH = os.getenv("ACCOUNT_CACHE_PATH")  # unset keeps the cache in memory only
+
+
+class AccountResolver:
+    """Long-lived customer ID -> account ID cache, optionally persisted to a JSON file"""
+
+    def __init__(self, ttl=ACCOUNT_CACHE_TTL, path=ACCOUNT_CACHE_PATH, client=None):
+        self.ttl = ttl
+        self.path = path
+        self._client = client
+        self._lock = threading.Lock()
+        self._accounts = self._load()  # customer_id -> {"account_id": ..., "resolved_at": ...}
+
+    def resolve(self, customer_id):
+        """Account ID for a customer, hitting Nessie only on a miss or expiry"""
+        with self._lock:
+            entry = self._accounts.get(customer_id)
+        if entry is not None and time.time() - entry["resolved_at"] < self.ttl:
+            return entry["account_id"]
+
+        client = self._client or get_client()
+        account_response = client.get_accounts(customer_id)
+        if account_response.status_code == 200:
+            accounts = account_response.json()
+            if accounts:
+                account_id = accounts[0]["_id"]   # ✅ use "_id", not "customer_id"
+            else:
+                raise ValueError("No accounts found for this customer")
+        else:
+            raise ValueError("Error fetching accounts:", account_response.text)
+
+        with self._lock:
+            self._accounts[customer_id] = {"account_id": account_id, "resolved_at": time.time()}
+            self._save()
+        return account_id
+
+    def invalidate(self, customer_id=None):
+        """Forget one customer's account, or every account when customer_id is None"""
+        with self._lock:
+            if customer_id is None:
+                self._accounts.clear()
+            else:
+                self._accounts.pop(customer_id, None)
+            self._save()
+
+    def _load(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self):
+        # Caller holds the lock; write-then-rename so readers never see a partial file
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self._accounts, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # persistence is best effort; the in-memory cache still works
+
+
+# Module-level instance is shared by every Streamlit session in this process
+ACCOUNTS = AccountResolver()
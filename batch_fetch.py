@@ -0,0 +1,58 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from get_transactions import fetch_table, CUSTOMER_IDS
+load_dotenv()
+
+# Keep at or below NESSIE_POOL_SIZE so workers don't queue for connections
+MAX_CONCURRENCY = int(os.getenv("FETCH_MAX_CONCURRENCY", "8"))
+
+
+async def fetch_many(customer_indexes=None, max_concurrency=MAX_CONCURRENCY, refresh=False):
+    """Fetch several customers' tables concurrently; returns (results, errors) keyed by customer index"""
+    if customer_indexes is None:
+        customer_indexes = range(len(CUSTOMER_IDS))
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_one(index):
+        async with semaphore:
+            # fetch_table is blocking I/O on the shared pooled session
+            return await asyncio.to_thread(fetch_table, index, refresh)
+
+    indexes = list(customer_indexes)
+    outcomes = await asyncio.gather(*(fetch_one(i) for i in indexes), return_exceptions=True)
+
+    results, errors = {}, {}
+    for index, outcome in zip(indexes, outcomes):
+        if isinstance(outcome, Exception):
+            errors[index] = outcome
+        else:
+            results[index] = outcome
+    return results, errors
+
+
+def fetch_many_sync(customer_indexes=None, max_concurrency=MAX_CONCURRENCY, refresh=False):
+    """Thread-pool version of fetch_many for callers without an event loop"""
+    if customer_indexes is None:
+        customer_indexes = range(len(CUSTOMER_IDS))
+    indexes = list(customer_indexes)
+
+    results, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(indexes) or 1))) as pool:
+        futures = {index: pool.submit(fetch_table, index, refresh) for index in indexes}
+        for index, future in futures.items():
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                errors[index] = e
+    return results, errors
+
+
+if __name__ == "__main__":
+    # Warm the transaction cache for every customer
+    results, errors = fetch_many_sync(refresh=True)
+    for index, purchases in sorted(results.items()):
+        print(f"customer {index}: {len(purchases)} purchases")
+    for index, error in sorted(errors.items()):
+        print(f"customer {index}: failed ({error!r})")
@@ -0,0 +1,66 @@
+"""clean_text throughput: legacy per-call re.sub chain vs the precompiled text_cleaning module.
+
+Run from the repo root:  python benchmarks/bench_clean_text.py [iterations]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import text_cleaning  # noqa: E402
+from text_cleaning import clean_text  # noqa: E402
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "llm_outputs.txt")
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        lines = [line for line in f.read().splitlines() if not line.startswith("#")]
+    return [entry.strip() for entry in "\n".join(lines).split("\n---\n") if entry.strip()]
+
+
+def legacy_clean_text(text):
+    """The old clean_text from journal.py/home_page.py, for comparison"""
+    text = re.sub(r'\$\$[^$]*\$\$', '', text)
+    text = re.sub(r'\$[^$]*\$', '', text)
+    text = re.sub(r'\\[a-zA-Z]+\{[^}]*\}', '', text)
+    text = re.sub(r'\\[a-zA-Z]+', '', text)
+    text = re.sub(r'[+=*/\\\[\]\{\}\^_]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    text = re.sub(r'\b(spending|spent|cost|costs|total of|for)\s+(\d+)\b', r'\1 $\2', text, flags=re.IGNORECASE)
+    text = re.sub(r'\b(\d+)\s*dollars?\b', r'$\1', text, flags=re.IGNORECASE)
+    text = re.sub(r'\b(at|for|of)\s+(\d{2,4})\b(?!\s*(?:years?|months?|days?|times?|percent|%|people|items?))', r'\1 $\2', text, flags=re.IGNORECASE)
+    text = re.sub(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+for\s+(\d+)\b', r'\1 for $\2', text)
+    text = re.sub(r'\b(total|totaling)\s+(\d+)\b', r'\1 $\2', text, flags=re.IGNORECASE)
+    text = re.sub(r'\b(\d{2,4})\s+(on\s+[a-z]+|at\s+[A-Z])', r'$\1 \2', text)
+    return text
+
+
+def per_call_us(fn, corpus, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in corpus:
+            fn(text)
+    return (time.perf_counter() - start) / (iterations * len(corpus)) * 1e6
+
+
+def main(iterations=200):
+    corpus = load_corpus()
+    # Single-pass output must match the legacy chain exactly
+    for text in corpus:
+        assert text_cleaning._clean(text) == legacy_clean_text(text), text
+
+    legacy_us = per_call_us(legacy_clean_text, corpus, iterations)
+    compiled_us = per_call_us(text_cleaning._clean, corpus, iterations)
+    cleaned = [clean_text(text) for text in corpus]
+    recheck_us = per_call_us(clean_text, cleaned, iterations)
+
+    print(f"corpus: {len(corpus)} outputs, {iterations} iterations")
+    print(f"legacy re.sub chain    {legacy_us:8.1f} us/call")
+    print(f"precompiled passes     {compiled_us:8.1f} us/call  ({legacy_us / compiled_us:.1f}x)")
+    print(f"already-clean recheck  {recheck_us:8.1f} us/call  ({legacy_us / recheck_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,79 @@
+"""Journal and chat latency against the offline stub LLM provider (no network, no API key).
+
+Run from the repo root:  python benchmarks/bench_llm_paths.py [weeks] [latency_ms] [failure_rate]
+"""
+import os
+import sys
+import time
+import statistics
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from llm_provider import StubProvider  # noqa: E402
+from transaction_table import TransactionTable  # noqa: E402
+from weekly_stats import recent_weeks  # noqa: E402
+from weekly_journal import generate_journal_entries  # noqa: E402
+from chat_context import build_system_context, build_turn_message  # noqa: E402
+
+DESCRIPTIONS = ["Dining — Chipotle", "Groceries — Kroger", "Coffee — Starbucks", "Gas — Shell", "Shopping — Target"]
+QUESTIONS = ["Should I cut back on dining?", "Any tips for my coffee habit?", "How do I build an emergency fund?"]
+
+
+def synthetic_table(weeks, per_week=40, seed=0):
+    rng = np.random.default_rng(seed)
+    n = weeks * per_week
+    days = np.datetime64("2025-01-06") + rng.integers(0, weeks * 7, n).astype("timedelta64[D]")
+    return TransactionTable.from_columns(
+        [f"p{i}" for i in range(n)],
+        np.datetime_as_string(days, unit="D").tolist(),
+        rng.uniform(3, 120, n).round(2).tolist(),
+        rng.choice(DESCRIPTIONS, n).tolist(),
+        [None] * n,
+    )
+
+
+def bench_journal(provider, table, weeks, max_workers):
+    start = time.perf_counter()
+    # The on-disk story cache would hide the provider latency, so bypass it
+    weeks = recent_weeks(table, weeks)
+    entries = list(generate_journal_entries(provider, weeks, max_workers=max_workers, use_cache=False))
+    return (time.perf_counter() - start) * 1000, entries
+
+
+def bench_chat(provider, table, turns=10):
+    chat = provider.create_chat(build_system_context(table))
+    ttft, total = [], []
+    for i in range(turns):
+        message = build_turn_message(table, QUESTIONS[i % len(QUESTIONS)])
+        start = time.perf_counter()
+        first = None
+        try:
+            for chunk in chat.send_message_stream(message):
+                if first is None and chunk.text:
+                    first = time.perf_counter()
+        except RuntimeError:
+            continue  # simulated failure
+        ttft.append((first - start) * 1000)
+        total.append((time.perf_counter() - start) * 1000)
+    return ttft, total
+
+
+def main(weeks=8, latency_ms=400.0, failure_rate=0.0):
+    provider = StubProvider(latency_ms=latency_ms, failure_rate=failure_rate)
+    table = synthetic_table(weeks)
+    print(f"stub provider: {latency_ms:.0f} ms to first token, failure rate {failure_rate:.0%}")
+    for workers in (1, 4, weeks):
+        elapsed, entries = bench_journal(provider, table, weeks, workers)
+        fallbacks = sum(entry["persona_name"] == "Financial Explorer" for entry in entries)
+        print(f"journal  {weeks} weeks, {workers:2d} workers  {elapsed:8.0f} ms  ({fallbacks} fallbacks)")
+    ttft, total = bench_chat(provider, table)
+    if ttft:
+        print(f"chat     {len(ttft)} turns  first token p50 {statistics.median(ttft):.0f} ms, "
+              f"total p50 {statistics.median(total):.0f} ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 8,
+         float(args[1]) if len(args) > 1 else 400.0,
+         float(args[2]) if len(args) > 2 else 0.0)
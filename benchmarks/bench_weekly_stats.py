@@ -0,0 +1,90 @@
+"""Weekly aggregation: per-row Python loop vs the vectorized weekly_stats pass.
+
+Run from the repo root:  python benchmarks/bench_weekly_stats.py [max_rows]
+"""
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from categorizer import CATEGORIZER  # noqa: E402
+from transaction_table import TransactionTable  # noqa: E402
+from weekly_stats import weekly_stats  # noqa: E402
+
+DESCRIPTIONS = [
+    "Dining — Chipotle", "Groceries — Kroger", "Coffee — Starbucks", "Gas — Shell",
+    "Shopping — Target", "Utilities — Duke Energy", "Entertainment — AMC", "Transport — Uber",
+]
+
+
+def make_records(n, seed=0):
+    rng = np.random.default_rng(seed)
+    start = date(2023, 1, 1)
+    offsets = rng.integers(0, 730, n)
+    amounts = np.round(rng.gamma(2.0, 15.0, n), 2)
+    picks = rng.integers(0, len(DESCRIPTIONS), n)
+    return [
+        {
+            "_id": f"p{i}",
+            "purchase_date": (start + timedelta(days=int(offsets[i]))).isoformat(),
+            "amount": float(amounts[i]),
+            "description": DESCRIPTIONS[picks[i]],
+            "merchant_id": f"m{picks[i]}",
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_weekly_stats(records):
+    """The old get_week_start + calculate_week_stats loops, for comparison"""
+    weeks = defaultdict(list)
+    for t in records:
+        day = datetime.strptime(t["purchase_date"], "%Y-%m-%d").date()
+        weeks[day - timedelta(days=day.weekday())].append(t)
+    result = {}
+    for week_start, week_transactions in weeks.items():
+        categories = defaultdict(float)
+        for t in week_transactions:
+            categories[CATEGORIZER.categorize(t["description"])] += t["amount"]
+        result[week_start] = {
+            "total": sum(t["amount"] for t in week_transactions),
+            "categories": dict(categories),
+            "transaction_count": len(week_transactions),
+        }
+    return result
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main(max_rows=1_000_000):
+    print(f"{'rows':>10} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+    n = 1_000
+    while n <= max_rows:
+        records = make_records(n)
+        table = TransactionTable.from_records(records)
+        legacy, legacy_s = timed(legacy_weekly_stats, records)
+        vectorized, vectorized_s = timed(weekly_stats, table)
+
+        # Same weeks, counts, (float-rounded) totals and per-category breakdown as the loop version
+        assert legacy.keys() == vectorized.keys()
+        for week, stats in legacy.items():
+            assert stats["transaction_count"] == vectorized[week]["transaction_count"]
+            assert abs(stats["total"] - vectorized[week]["total"]) < 1e-6 * max(1.0, stats["total"])
+            categories = vectorized[week]["categories"]
+            assert stats["categories"].keys() == categories.keys()
+            for category, amount in stats["categories"].items():
+                assert abs(amount - categories[category]) < 1e-6 * max(1.0, amount)
+
+        print(f"{n:>10} {legacy_s:>12.4f} {vectorized_s:>15.4f} {legacy_s / vectorized_s:>7.1f}x")
+        n *= 10
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,352 @@
+"""End-to-end benchmark suite for the dashboard, journal and chat code paths.
+
+Every case runs at each transaction count (1k to 1M by default) against synthetic data served by an
+in-process mock Nessie, so no network or API keys are needed. Results are saved per commit to
+benchmarks/results/<commit>.json; --compare diffs the current run against an earlier one.
+
+Run from the repo root:
+    python benchmarks/run_benchmarks.py                      # all cases, all sizes
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --only chart log
+    python benchmarks/run_benchmarks.py --compare <commit>   # flag cases more than 10% slower
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+sys.path.insert(0, ROOT)
+# Keep the benchmark's SQLite store and story cache away from the app's own files
+_scratch = tempfile.mkdtemp(prefix="fyn-bench-")
+os.environ["PURCHASE_STORE_PATH"] = os.path.join(_scratch, "purchases.db")
+os.environ["LLM_CACHE_DIR"] = os.path.join(_scratch, "llm_cache")
+os.environ.pop("ACCOUNT_CACHE_PATH", None)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import mock_nessie  # noqa: E402
+import nessie_client  # noqa: E402
+import purchase_store  # noqa: E402
+import get_transactions  # noqa: E402
+from synthetic_data import SyntheticBank  # noqa: E402
+from account_ids import ACCOUNTS  # noqa: E402
+from transaction_cache import TRANSACTIONS  # noqa: E402
+from dashboard_data import load_dashboard_frame, chart_data, filter_log, log_page, render_log_html, build_figures, cached_figures  # noqa: E402
+from weekly_stats import weekly_stats, recent_weeks  # noqa: E402
+from weekly_journal import build_journal_prompt  # noqa: E402
+from text_cleaning import clean_text  # noqa: E402
+import text_cleaning  # noqa: E402
+from chat_context import build_system_context, build_turn_message  # noqa: E402
+from local_answers import answer_locally  # noqa: E402
+
+CHAT_QUESTIONS = [
+    "How much did I spend on dining last month?",
+    "What's my biggest expense category?",
+    "Show my Starbucks purchases in september",
+    "Help me create a savings plan",
+]
+
+
+class Dataset:
+    """One synthetic customer with about n purchases, served by a mock Nessie on a random port"""
+
+    def __init__(self, n):
+        self.n = n
+        # Longer histories for bigger customers so per-day density stays plausible
+        self.bank = SyntheticBank(customers=1, purchases_per_customer=n, seed=n % 65536,
+                                  end_date="2025-10-01", days=max(180, n // 40))
+        self.server = mock_nessie.start(self.bank)
+        self.client = nessie_client.NessieClient(base_url=mock_nessie.server_url(self.server))
+        self._table = None
+
+    def use(self, store_path):
+        """Point the app modules at this dataset and a fresh store"""
+        nessie_client._client = self.client
+        get_transactions.CUSTOMER_IDS[:] = self.bank.customer_ids()
+        ACCOUNTS.invalidate()
+        TRANSACTIONS.invalidate()
+        if os.path.exists(store_path):
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(store_path + suffix):
+                    os.remove(store_path + suffix)
+        purchase_store._store = purchase_store.PurchaseStore(path=store_path)
+
+    @property
+    def table(self):
+        if self._table is None:
+            self.use(os.environ["PURCHASE_STORE_PATH"])
+            self._table = get_transactions.fetch_table_uncached(0)
+        return self._table
+
+    def close(self):
+        self.server.shutdown()
+        self.client.close()
+
+
+# --- Cases: setup(dataset) -> state, run(state) ---
+
+def setup_fetch_cold(data):
+    return data
+
+
+def run_fetch_cold(data):
+    # Empty store: HTTP + JSON decode + SQLite insert + columnar read
+    data.use(os.path.join(_scratch, "cold.db"))
+    get_transactions.fetch_table_uncached(0)
+
+
+def setup_fetch_warm(data):
+    data.table  # noqa: B018 - syncs the shared store once
+    return data
+
+
+def run_fetch_warm(data):
+    # Store already synced: SQLite read + TransactionTable build, no HTTP
+    get_transactions.fetch_table_uncached(0)
+
+
+def run_fetch_totals_warm(data):
+    # Store already synced: SQLite read of the per-day x category aggregate
+    get_transactions.fetch_totals_uncached(0)
+
+
+def run_fetch_trans_warm(data):
+    # Store already synced: SQLite read + JSON decode of every stored purchase
+    get_transactions.fetch_trans_uncached(0)
+
+
+def run_dataframe(table):
+    load_dashboard_frame(table)
+
+
+def setup_frame(data):
+    return load_dashboard_frame(data.table)
+
+
+def setup_totals(data):
+    data.table  # noqa: B018 - syncs the shared store once
+    return get_transactions.fetch_totals_uncached(0)
+
+
+def run_chart(totals):
+    chart_data(totals, now=pd.Timestamp("2025-10-01"))
+
+
+def setup_figures(data):
+    return chart_data(setup_totals(data), now=pd.Timestamp("2025-10-01"))
+
+
+def run_figures(totals):
+    build_figures(*totals)
+
+
+def run_figures_cached(totals):
+    # Rerun with unchanged data: fingerprint the inputs and reuse the figures
+    cached_figures(*totals)
+
+
+def run_log(df):
+    # Legacy full-history render, kept to show what windowing saves
+    render_log_html(df)
+
+
+def run_log_page(df):
+    # What a log rerun does: filter, take one page, format just that page
+    rows, _, _ = log_page(filter_log(df, start="2025-06-01", search="groceries"), page=2, page_size=50)
+    render_log_html(rows)
+
+
+def run_weekly_stats(table):
+    weekly_stats(table)
+
+
+def run_recent_weeks(table):
+    recent_weeks(table)
+
+
+def setup_journal_prompts(data):
+    return recent_weeks(data.table)
+
+
+def run_journal_prompts(weeks):
+    for week in weeks:
+        build_journal_prompt(week["stats"], week["table"].to_records(), week["week_start"], week["week_end"])
+
+
+def run_chat_system_context(table):
+    build_system_context(table)
+
+
+def run_chat_turn_messages(table):
+    for question in CHAT_QUESTIONS:
+        build_turn_message(table, question)
+
+
+def run_chat_local_answers(table):
+    for question in CHAT_QUESTIONS:
+        answer_locally(table, question, today="2025-10-01")
+
+
+def setup_clean_text(data):
+    # clean_text works on model outputs, so it runs over the sample corpus regardless of n
+    from bench_clean_text import load_corpus
+    return load_corpus()
+
+
+def run_clean_text(corpus):
+    for text in corpus:
+        text_cleaning._clean(text)
+
+
+def setup_clean_text_recheck(data):
+    # Outputs that were already cleaned once are recognized and returned as-is
+    return [clean_text(text) for text in setup_clean_text(data)]
+
+
+def run_clean_text_recheck(cleaned):
+    for text in cleaned:
+        clean_text(text)
+
+
+def table_of(data):
+    return data.table
+
+
+CASES = [
+    # name, setup, run, sized
+    ("fetch_table.cold", setup_fetch_cold, run_fetch_cold, True),
+    ("fetch_table.warm", setup_fetch_warm, run_fetch_warm, True),
+    ("fetch_totals.warm", setup_fetch_warm, run_fetch_totals_warm, True),
+    ("fetch_trans.warm", setup_fetch_warm, run_fetch_trans_warm, True),
+    ("dashboard.dataframe", table_of, run_dataframe, True),
+    ("dashboard.chart_data", setup_totals, run_chart, True),
+    ("dashboard.figures", setup_figures, run_figures, True),
+    ("dashboard.figures_cached", setup_figures, run_figures_cached, True),
+    ("dashboard.log_html", setup_frame, run_log, True),
+    ("dashboard.log_page", setup_frame, run_log_page, True),
+    ("weeks.weekly_stats", table_of, run_weekly_stats, True),
+    ("weeks.recent_weeks", table_of, run_recent_weeks, True),
+    ("journal.prompts", setup_journal_prompts, run_journal_prompts, True),
+    ("chat.system_context", table_of, run_chat_system_context, True),
+    ("chat.turn_messages", table_of, run_chat_turn_messages, True),
+    ("chat.local_answers", table_of, run_chat_local_answers, True),
+    ("clean_text.corpus", setup_clean_text, run_clean_text, False),
+    ("clean_text.recheck", setup_clean_text_recheck, run_clean_text_recheck, False),
+]
+
+
+def measure(run, state, min_time, max_repeats, warmup=True):
+    """Repeat run(state) until min_time has elapsed (at least once); returns timings in ms"""
+    if warmup:
+        run(state)  # first call pays lazy imports and caches that a running app has already paid
+    timings = []
+    total = 0.0
+    while not timings or (total < min_time and len(timings) < max_repeats):
+        start = time.perf_counter()
+        run(state)
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed * 1000)
+        total += elapsed
+    return timings
+
+
+def git_commit():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"],
+                                             cwd=ROOT, text=True).strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+
+def load_results(ref):
+    path = ref if ref.endswith(".json") else os.path.join(RESULTS_DIR, f"{ref}.json")
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fyn end-to-end benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="transaction counts")
+    parser.add_argument("--only", nargs="+", help="run cases whose name contains any of these")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds of repeats per case and size")
+    parser.add_argument("--max-repeats", type=int, default=50)
+    parser.add_argument("--compare", help="commit (or results JSON path) to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown that counts as a regression")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args(argv)
+
+    cases = [c for c in CASES if not args.only or any(key in c[0] for key in args.only)]
+    commit, dirty = git_commit()
+    results = {}
+    for n in sorted(args.sizes):
+        data = Dataset(n)
+        try:
+            for name, setup, run, sized in cases:
+                if not sized and n != min(args.sizes):
+                    continue
+                state = setup(data)
+                timings = measure(run, state, args.min_time, args.max_repeats, warmup=not name.endswith(".cold"))
+                key = str(n) if sized else "-"
+                results.setdefault(name, {})[key] = {
+                    "median_ms": statistics.median(timings),
+                    "min_ms": min(timings),
+                    "repeats": len(timings),
+                }
+                print(f"{name:24s} {key:>9s}  median {statistics.median(timings):10.2f} ms  "
+                      f"min {min(timings):10.2f} ms  x{len(timings)}", flush=True)
+        finally:
+            data.close()
+
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)",
+        "results": results,
+    }
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json")
+        # Merge with an earlier partial run of the same commit so --only/--sizes runs accumulate
+        if os.path.exists(path):
+            previous = load_results(path)["results"]
+            for name, by_size in results.items():
+                previous.setdefault(name, {}).update(by_size)
+            report["results"] = previous
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"saved {path}")
+
+    if args.compare:
+        baseline = load_results(args.compare)
+        print(f"\nvs {baseline['commit']} ({baseline['timestamp']}), median time ratio (new / old):")
+        regressions = 0
+        for name, by_size in results.items():
+            for key, current in by_size.items():
+                old = baseline["results"].get(name, {}).get(key)
+                if not old:
+                    continue
+                ratio = current["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+                flag = "  REGRESSION" if ratio > 1 + args.threshold else ""
+                regressions += bool(flag)
+                print(f"{name:24s} {key:>9s}  {old['median_ms']:10.2f} -> {current['median_ms']:10.2f} ms  "
+                      f"x{ratio:5.2f}{flag}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import os
+import re
+import json
+import hashlib
+import functools
+from dotenv import load_dotenv
+load_dotenv()
+
+# --- Config (overridable through .env) ---
+CATEGORY_RULES_PATH = os.getenv("CATEGORY_RULES_PATH")  # optional JSON rule file
+CATEGORY_MEMO_SIZE = int(os.getenv("CATEGORY_MEMO_SIZE", "8192"))
+
+# Rule file format (every key optional):
+# {
+#   "merchants": {"<merchant_id>": "Category"},          checked first
+#   "patterns": [["<regex>", "Category"]],                case-insensitive, first match wins
+#   "prefixes": {"<description prefix>": "Category"},   case-insensitive
+#   "separator": " — ",                                  text before it is the category
+#   "default": "Other"                                   for empty or blank descriptions
+# }
+DEFAULT_RULES = {
+    "merchants": {},
+    "patterns": [],
+    "prefixes": {},
+    "separator": " — ",
+    "default": "Other",
+}
+
+
+class Categorizer:
+    """Maps a purchase description (and merchant) to a category using rules compiled once"""
+
+    def __init__(self, rules=None, memo_size=CATEGORY_MEMO_SIZE):
+        rules = {**DEFAULT_RULES, **(rules or {})}
+        # Identifies the rule set, so stored per-category aggregates can tell when they are stale
+        self.key = hashlib.sha1(json.dumps(rules, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        self.merchants = dict(rules["merchants"])
+        self.patterns = [(re.compile(pattern, re.IGNORECASE), category) for pattern, category in rules["patterns"]]
+        # Longest prefix first so "Coffee Shop" beats "Coffee"
+        self.prefixes = sorted(
+            ((prefix.lower(), category) for prefix, category in rules["prefixes"].items()),
+            key=lambda item: len(item[0]), reverse=True,
+        )
+        self.separator = rules["separator"]
+        self.default = rules["default"]
+        # Bounded memo of description -> category
+        self._memo = functools.lru_cache(maxsize=memo_size)(self._categorize)
+
+    def categorize(self, description, merchant_id=None):
+        if merchant_id is not None and merchant_id in self.merchants:
+            return self.merchants[merchant_id]
+        return self._memo(description or "")
+
+    def _categorize(self, description):
+        if not description:
+            return self.default
+        for pattern, category in self.patterns:
+            if pattern.search(description):
+                return category
+        lowered = description.lower()
+        for prefix, category in self.prefixes:
+            if lowered.startswith(prefix):
+                return category
+        if self.separator and self.separator in description:
+            return description.split(self.separator)[0]
+        # Whitespace-only descriptions have no first word
+        words = description.split()
+        return words[0] if words else self.default
+
+    def categorize_many(self, descriptions, merchant_ids=None):
+        """Categories for a sequence of descriptions, categorizing each distinct value once"""
+        if merchant_ids is None:
+            merchant_ids = [None] * len(descriptions)
+        seen = {}
+        return [
+            seen[key] if key in seen else seen.setdefault(key, self.categorize(*key))
+            for key in zip(descriptions, merchant_ids)
+        ]
+
+    def memo_info(self):
+        return self._memo.cache_info()
+
+
+def load_rules(path=CATEGORY_RULES_PATH):
+    if not path:
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+# Process-wide categorizer used at ingest and by the dashboard
+CATEGORIZER = Categorizer(load_rules())
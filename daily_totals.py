@@ -0,0 +1,115 @@
+import numpy as np
+
+
+class DailyTotals:
+    """Per-day x category purchase totals for one account, as kept up to date by the purchase store"""
+
+    def __init__(self, days, category_codes, categories, amounts, counts,
+                 undated_amounts, undated_counts):
+        self.days = days                      # datetime64[ns], ascending
+        self.category_codes = category_codes  # int32 codes into categories
+        self.categories = categories          # distinct categories, sorted
+        self.amounts = amounts                # float64 sum per (day, category)
+        self.counts = counts                  # int64 purchases per (day, category)
+        # Purchases without a usable date count towards whole-history totals only
+        self.undated_amounts = undated_amounts  # float64 per category
+        self.undated_counts = undated_counts    # int64 per category
+
+    @classmethod
+    def from_columns(cls, days, categories, amounts, counts):
+        """Build from parallel column lists (e.g. PurchaseStore.read_daily_totals); '' days are undated"""
+        category_values, category_codes = np.unique(np.array(categories, dtype=object), return_inverse=True)
+        category_codes = category_codes.astype(np.int32)
+        amounts = np.array(amounts, dtype=np.float64)
+        counts = np.array(counts, dtype=np.int64)
+        dated = np.array([bool(day) for day in days], dtype=bool)
+        undated_codes = category_codes[~dated]
+        return cls(
+            days=np.array([day for day in days if day], dtype="datetime64[D]").astype("datetime64[ns]"),
+            category_codes=category_codes[dated],
+            categories=category_values,
+            amounts=amounts[dated],
+            counts=counts[dated],
+            undated_amounts=np.bincount(undated_codes, weights=amounts[~dated], minlength=len(category_values)),
+            undated_counts=np.bincount(undated_codes, weights=counts[~dated], minlength=len(category_values)).astype(np.int64),
+        )
+
+    @classmethod
+    def empty(cls):
+        return cls.from_columns([], [], [], [])
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @property
+    def nbytes(self):
+        return sum(
+            column.nbytes for column in (
+                self.days, self.category_codes, self.categories, self.amounts, self.counts,
+                self.undated_amounts, self.undated_counts,
+            )
+        )
+
+    def _window(self, start, end):
+        """Row slice for days in [start, end]; the rows are sorted by day, so this is two binary searches"""
+        lo = 0 if start is None else int(np.searchsorted(self.days, np.datetime64(start, "ns"), side="left"))
+        if end is None:
+            return slice(lo, len(self.days))
+        # end is a day: everything before the next midnight
+        next_day = np.datetime64(np.datetime64(end, "D") + np.timedelta64(1, "D"), "ns")
+        return slice(lo, int(np.searchsorted(self.days, next_day, side="left")))
+
+    def total(self, start=None, end=None):
+        """Amount spent in the window (whole history, undated purchases included, when unbounded)"""
+        total = float(self.amounts[self._window(start, end)].sum())
+        if start is None and end is None:
+            total += float(self.undated_amounts.sum())
+        return total
+
+    def by_category(self, start=None, end=None):
+        """(categories, amounts) for categories with purchases in the window, sorted by category"""
+        window = self._window(start, end)
+        codes = self.category_codes[window]
+        amounts = np.bincount(codes, weights=self.amounts[window], minlength=len(self.categories))
+        counts = np.bincount(codes, weights=self.counts[window], minlength=len(self.categories))
+        if start is None and end is None:
+            amounts = amounts + self.undated_amounts
+            counts = counts + self.undated_counts
+        present = counts > 0
+        return self.categories[present], amounts[present]
+
+    def by_day(self, start=None, end=None):
+        """(days, amounts) with one entry per day that has purchases in the window, ascending"""
+        return self.by_period(start, end, "D")
+
+    def by_period(self, start=None, end=None, period="D"):
+        """(period starts, amounts) per day, week (from Monday), month or year with purchases in the window"""
+        window = self._window(start, end)
+        buckets = period_starts(self.days[window], period)
+        if not len(buckets):
+            return buckets, np.empty(0, dtype=np.float64)
+        # Rows are sorted by day, so each bucket is one contiguous run
+        first_rows = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        return buckets[first_rows], np.add.reduceat(self.amounts[window], first_rows)
+
+
+def period_starts(days, period):
+    """First day of the day/week/month/year ("D"/"W"/"M"/"Y") containing each of days, as datetime64[ns]"""
+    days = days.astype("datetime64[D]")
+    if period == "W":
+        # 1970-01-01 was a Thursday: (day number + 3) % 7 is the weekday with Monday = 0
+        days = days - (days.astype(np.int64) + 3) % 7
+    elif period in ("M", "Y"):
+        days = days.astype(f"datetime64[{period}]")
+    elif period != "D":
+        raise ValueError(f"Unknown period {period!r}")
+    return days.astype("datetime64[ns]")
+
+
+def choose_period(start, end, max_points):
+    """Finest of day/week/month/year that keeps [start, end] within max_points buckets"""
+    span_days = int((np.datetime64(end, "D") - np.datetime64(start, "D")) / np.timedelta64(1, "D")) + 1
+    for period, days_per_bucket in (("D", 1), ("W", 7), ("M", 30.44)):
+        if span_days / days_per_bucket <= max_points:
+            return period
+    return "Y"
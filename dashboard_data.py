@@ -0,0 +1,199 @@
+import os
+import html
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+import plotly.express as px
+from dotenv import load_dotenv
+from instrumentation import timed
+from transaction_cache import TransactionCache
+from daily_totals import choose_period
+load_dotenv()
+
+# --- Config (overridable through .env) ---
+FIGURE_CACHE_TTL = float(os.getenv("FIGURE_CACHE_TTL", "3600"))  # seconds
+FIGURE_CACHE_MAX_ENTRIES = int(os.getenv("FIGURE_CACHE_MAX_ENTRIES", "64"))
+FIGURE_CACHE_MAX_BYTES = int(os.getenv("FIGURE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "120"))  # most points the expenditure line may plot
+
+EMPTY_COLUMNS = ["purchase_date", "amount", "description", "category", "date"]
+PERIOD_LABELS = {"D": "Daily", "W": "Weekly", "M": "Monthly", "Y": "Yearly"}
+
+# Styling shared by the three charts; part of the figure cache key
+CHART_THEME = {
+    "plot_bgcolor": "rgba(0,0,0,0)",
+    "paper_bgcolor": "rgba(255,255,255,0)",
+    "font_color": "#333",
+    "title_font_size": 14,
+    "height": 300,
+    "gridcolor": "rgba(139,69,19,0.2)",
+}
+
+
+@timed("dashboard.dataframe")
+def load_dashboard_frame(table):
+    """The dashboard's DataFrame: one row per purchase, newest first"""
+    # Columnar table is built once at ingest; categories and dates are already typed
+    df = table.to_pandas()
+    return df.sort_values(by="date", ascending=False)
+
+
+@timed("dashboard.chart_data")
+def chart_data(totals, now=None, start=None, end=None, max_points=CHART_MAX_POINTS):
+    """(category totals, past-week category totals, expenditure over time, its period) for the three charts
+
+    start/end (inclusive dates) limit the bar and line charts; the line is bucketed by day, week, month
+    or year, whichever keeps the range within max_points points.
+    """
+    # Slices of the per-day x category aggregate; cost follows the number of days shown, not purchases
+    categories, amounts = totals.by_category(start, end)
+    category_totals = pd.DataFrame({"category": categories, "amount": amounts})
+
+    # Past week's data (pie chart)
+    week_ago = (now or pd.Timestamp.now()) - pd.Timedelta(days=7)
+    categories, amounts = totals.by_category(start=week_ago)
+    week_category_totals = pd.DataFrame({"category": categories, "amount": amounts})
+
+    # Expenditure over the range (line chart)
+    period = "D"
+    if len(totals.days):
+        period = choose_period(start or totals.days[0], end or totals.days[-1], max_points)
+    periods, amounts = totals.by_period(start, end, period)
+    expenditure = pd.DataFrame({"date": periods, "amount": amounts})
+    return category_totals, week_category_totals, expenditure, period
+
+
+LOG_PAGE_SIZES = [25, 50, 100, 250]
+
+
+@timed("dashboard.log_filter")
+def filter_log(df, start=None, end=None, search=None):
+    """Rows of df within [start, end] (dates, inclusive) whose description contains search"""
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= (df["date"] >= pd.Timestamp(start)).to_numpy()
+    if end is not None:
+        mask &= (df["date"] < pd.Timestamp(end) + pd.Timedelta(days=1)).to_numpy()
+    search = (search or "").strip()
+    if search:
+        descriptions = df["description"]
+        if isinstance(descriptions.dtype, pd.CategoricalDtype):
+            # Match against each distinct description once, then select rows by code
+            matching = descriptions.cat.categories.str.contains(search, case=False, regex=False)
+            mask &= np.isin(descriptions.cat.codes.to_numpy(), np.flatnonzero(matching))
+        else:
+            mask &= descriptions.fillna("").str.contains(search, case=False, regex=False).to_numpy()
+    return df[mask] if not mask.all() else df
+
+
+def log_page(df, page=1, page_size=LOG_PAGE_SIZES[1]):
+    """(rows on the page, page number clamped to range, page count) for a newest-first frame"""
+    page_count = max(1, -(-len(df) // page_size))
+    page = min(max(1, page), page_count)
+    return df.iloc[(page - 1) * page_size:page * page_size], page, page_count
+
+
+@timed("dashboard.log_html")
+def render_log_html(df):
+    """Transaction log rows as HTML snippets, in DataFrame order"""
+    if df.empty:
+        return []
+    # Column-at-a-time formatting; callers pass one page, not the whole history
+    dates = df["date"].dt.strftime("%m/%d/%y").fillna("")
+    descriptions = df["description"].astype(object).fillna("").map(html.escape)
+    amounts = df["amount"].abs().map("${:,.2f}".format)
+    return ("<div class='log-entry'>" + dates + ": " + descriptions + " (" + amounts + ")</div>").tolist()
+
+
+def figures_fingerprint(frames, theme=CHART_THEME):
+    """Digest of the chart inputs' contents and the theme; equal data gives an equal key"""
+    digest = hashlib.blake2b(digest_size=16)
+    for frame in frames:
+        digest.update(",".join(map(str, frame.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    digest.update(json.dumps(theme, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _figures_size(figures):
+    # Serialized size is what a cached figure costs to keep and to ship
+    return sum(len(pio.to_json(fig, validate=False)) for fig in figures)
+
+
+# Shared by every session in the process; figures are never mutated after they are built
+FIGURES = TransactionCache(ttl=FIGURE_CACHE_TTL, max_entries=FIGURE_CACHE_MAX_ENTRIES,
+                           max_bytes=FIGURE_CACHE_MAX_BYTES, sizeof=_figures_size)
+
+
+@timed("dashboard.figure_cache")
+def cached_figures(category_totals, week_category_totals, expenditure, period="D", theme=CHART_THEME):
+    """build_figures, reusing the figures from an earlier rerun or session when the inputs are unchanged"""
+    key = figures_fingerprint((category_totals, week_category_totals, expenditure), {**theme, "period": period})
+    return FIGURES.get_or_load(
+        key, lambda: build_figures(category_totals, week_category_totals, expenditure, period, theme)
+    )
+
+
+def figure_cache_stats():
+    return FIGURES.stats()
+
+
+@timed("dashboard.figures")
+def build_figures(category_totals, week_category_totals, expenditure, period="D", theme=CHART_THEME):
+    """(bar, pie, line) Plotly figures for the dashboard charts"""
+    # 1. Category totals bar chart
+    fig1 = px.bar(
+        category_totals,
+        x="category",
+        y="amount",
+        labels={"category": "Category", "amount": "Amount ($)"},
+        title="Spending by Category",
+    )
+    fig1.update_traces(hoverinfo="skip")
+    fig1.update_layout(
+        plot_bgcolor=theme["plot_bgcolor"],
+        paper_bgcolor=theme["paper_bgcolor"],
+        font_color=theme["font_color"],
+        title_font_size=theme["title_font_size"],
+        showlegend=False,
+        height=theme["height"],
+    )
+    fig1.update_xaxes(showgrid=False)
+    fig1.update_yaxes(showgrid=True, gridcolor=theme["gridcolor"])
+    
+    # 2. Weekly pie chart
+    fig2 = px.pie(
+        week_category_totals,
+        values="amount",
+        names="category",
+        title="Past Week's Expenses",
+    )
+    fig2.update_layout(
+        paper_bgcolor=theme["paper_bgcolor"],
+        font_color=theme["font_color"],
+        title_font_size=theme["title_font_size"],
+        height=theme["height"],
+    )
+    
+    # 3. Expenditure line chart, one point per period
+    fig3 = px.line(
+        expenditure,
+        x="date",
+        y="amount",
+        labels={"date": "Date", "amount": "Amount ($)"},
+        title=f"{PERIOD_LABELS[period]} Expenditure",
+        markers=True,
+    )
+    fig3.update_layout(
+        plot_bgcolor=theme["plot_bgcolor"],
+        paper_bgcolor=theme["paper_bgcolor"],
+        font_color=theme["font_color"],
+        title_font_size=theme["title_font_size"],
+        showlegend=False,
+        height=theme["height"],
+    )
+    fig3.update_xaxes(showgrid=False)
+    fig3.update_yaxes(showgrid=True, gridcolor=theme["gridcolor"])
+    return fig1, fig2, fig3
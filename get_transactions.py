@@ -1,47 +1,120 @@
-import requests
-import json
 import os
 from dotenv import load_dotenv
+from nessie_client import get_client
+from transaction_cache import TRANSACTIONS
+from account_ids import ACCOUNTS
+from purchase_store import get_store
+from transaction_table import TransactionTable
+from daily_totals import DailyTotals
+from instrumentation import timed
 load_dotenv()
 
+DEFAULT_CUSTOMER_IDS = ["68d854ba9683f20dd5196bef", "68d854be9683f20dd5196c20", "68d854c29683f20dd5196c56"]
 
-def fetch_trans(id):
-    # Hardcoded values
-    API_KEY = os.getenv("NESSIE_KEY")
-    BASE_URL = "http://api.nessieisreal.com"
-    CUSTOMER_IDS = ["68d854ba9683f20dd5196bef", "68d854be9683f20dd5196c20", "68d854c29683f20dd5196c56"]
+
+def load_customer_ids():
+    """Customer IDs from NESSIE_CUSTOMER_IDS (comma-separated) or NESSIE_CUSTOMER_IDS_FILE (one per line)"""
+    path = os.getenv("NESSIE_CUSTOMER_IDS_FILE")
+    if path:
+        with open(path) as f:
+            return [line.strip() for line in f if line.strip()]
+    ids = [i.strip() for i in os.getenv("NESSIE_CUSTOMER_IDS", "").split(",") if i.strip()]
+    return ids or DEFAULT_CUSTOMER_IDS
+
+
+CUSTOMER_IDS = load_customer_ids()
+
+
+def invalidate_customer(id):
+    """Drop every cached view (table, daily totals, purchase dicts) of customer index id"""
+    for key in (id, ("totals", id), ("records", id)):
+        TRANSACTIONS.invalidate(key)
+
+
+def fetch_table(id, refresh=False):
+    """Columnar purchases for customer index id, served from the process-wide cache"""
+    if refresh:
+        invalidate_customer(id)
+    return TRANSACTIONS.get_or_load(id, lambda: fetch_table_uncached(id, force_sync=refresh))
+
+
+def fetch_trans(id, refresh=False):
+    """Purchases for customer index id as the full Nessie purchase dicts, newest first, served from the process-wide cache"""
+    if refresh:
+        invalidate_customer(id)
+    return TRANSACTIONS.get_or_load(("records", id), lambda: fetch_trans_uncached(id, force_sync=refresh))
+
+
+def fetch_totals(id, refresh=False):
+    """Per-day x category totals for customer index id, served from the process-wide cache"""
+    if refresh:
+        invalidate_customer(id)
+    return TRANSACTIONS.get_or_load(("totals", id), lambda: fetch_totals_uncached(id, force_sync=refresh))
+
+
+@timed("fetch.load")
+def fetch_table_uncached(id, force_sync=False):
+    """Sync the customer's purchases into the local store and read them back as a table"""
+    ACCOUNT_ID = synced_account(id, force_sync)
+    return TransactionTable.from_columns(*get_store().read_columns(ACCOUNT_ID))
+
+
+@timed("fetch.records")
+def fetch_trans_uncached(id, force_sync=False):
+    """Sync the customer's purchases into the local store and read back the stored purchase JSON"""
+    # The table only keeps the columns the dashboard uses; the stored JSON has every field
+    return get_store().read_purchases(synced_account(id, force_sync))
+
+
+@timed("fetch.totals")
+def fetch_totals_uncached(id, force_sync=False):
+    """Sync the customer's purchases into the local store and read its daily totals"""
+    ACCOUNT_ID = synced_account(id, force_sync)
+    return DailyTotals.from_columns(*get_store().read_daily_totals(ACCOUNT_ID))
+
+
+def synced_account(id, force_sync=False):
+    """Account ID for customer index id, with its purchases synced when the store copy is stale
+
+    force_sync syncs with Nessie even inside PURCHASE_SYNC_INTERVAL, for explicit refreshes.
+    """
+    store = get_store()
     CUSTOMER_ID = CUSTOMER_IDS[id]
     #Input the correct customer ID above
-    # Get account id for customer
-    account_url = f"{BASE_URL}/customers/{CUSTOMER_ID}/accounts?key={API_KEY}"
-    account_response = requests.get(account_url)
-
-    if account_response.status_code == 200:
-        accounts = account_response.json()
-        if accounts:
-            ACCOUNT_ID = accounts[0]["_id"]   # ✅ use "_id", not "customer_id"
-        else:
-            raise ValueError("No accounts found for this customer")
-    else:
-        raise ValueError("Error fetching accounts:", account_response.text)
-
-    # Build purchases endpoint URL
-    url = f"{BASE_URL}/accounts/{ACCOUNT_ID}/purchases?key={API_KEY}"
-
-    # Fetch purchases
-    response = requests.get(url)
-
-    if response.status_code == 200:
-        purchases = response.json()
-    else:
-        # In case of error (like 404), still dump the error message
-        purchases = {
-            "account_id": ACCOUNT_ID,
-            "status_code": response.status_code,
-            "response": response.json()
-        }
-
-    for purchase in purchases:
-        purchase['status'] = "executed"
-
-    return purchases
+    try:
+        # Account ID comes from the long-lived resolver cache, so steady state is one request
+        ACCOUNT_ID = ACCOUNTS.resolve(CUSTOMER_ID)
+    except Exception:
+        # Nessie unreachable: fall back to the account we last synced for this customer
+        ACCOUNT_ID = store.account_for(CUSTOMER_ID)
+        if ACCOUNT_ID is None:
+            raise
+
+    if force_sync or store.needs_sync(ACCOUNT_ID):
+        try:
+            ACCOUNT_ID = sync_purchases(CUSTOMER_ID, ACCOUNT_ID)
+        except Exception:
+            # Keep serving the last synced copy rather than blanking the dashboard
+            if not store.has_account(ACCOUNT_ID):
+                raise
+    return ACCOUNT_ID
+
+
+@timed("fetch.sync")
+def sync_purchases(CUSTOMER_ID, ACCOUNT_ID):
+    # All Nessie traffic goes through the shared pooled client
+    client = get_client()
+    response = client.get_purchases(ACCOUNT_ID)
+
+    if response.status_code == 404:
+        # Cached account may have been deleted/recreated: re-resolve once and retry
+        ACCOUNTS.invalidate(CUSTOMER_ID)
+        ACCOUNT_ID = ACCOUNTS.resolve(CUSTOMER_ID)
+        response = client.get_purchases(ACCOUNT_ID)
+
+    if response.status_code != 200:
+        raise ValueError("Error fetching purchases:", response.status_code, response.text)
+
+    # Only new or changed purchases are written; unchanged ones are already stored
+    get_store().sync(ACCOUNT_ID, response.json(), customer_id=CUSTOMER_ID)
+    return ACCOUNT_ID
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from dotenv import load_dotenv
+load_dotenv()
+
+# --- Config (overridable through .env) ---
+ENABLED = os.getenv("INSTRUMENTATION", "0").lower() in ("1", "true", "yes")
+WINDOW = int(os.getenv("INSTRUMENTATION_WINDOW", "1024"))       # recent samples kept per span for p50/p95
+METRICS_PORT = int(os.getenv("INSTRUMENTATION_PORT", "0"))      # serve /metrics and /metrics.json when set
+
+
+class SpanStats:
+    """Count, total and a window of recent durations for one span name"""
+
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "recent")
+
+    def __init__(self, window=WINDOW):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, elapsed_ms, error=False):
+        self.count += 1
+        self.errors += int(error)
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.recent.append(elapsed_ms)
+
+
+def _percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class Recorder:
+    """Aggregates span timings process-wide and keeps the spans of the current rerun per thread"""
+
+    def __init__(self, enabled=ENABLED, window=WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, name, elapsed_ms, error=False):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = SpanStats(self.window)
+            stats.add(elapsed_ms, error)
+
+    @contextmanager
+    def _span(self, name):
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        # Listed in start order so the rerun panel reads top to bottom like the page
+        run = getattr(self._local, "run", None)
+        entry = [name, None, depth]
+        if run is not None:
+            run.append(entry)
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self._local.depth = depth
+            entry[1] = (time.perf_counter() - start) * 1000
+            self.record(name, entry[1], error)
+
+    def span(self, name):
+        """Context manager timing a block under name; a shared no-op when disabled"""
+        if not self.enabled:
+            return _NOOP
+        return self._span(name)
+
+    def timed(self, name=None):
+        """Decorator timing every call of a function (name defaults to module.function)"""
+        def decorate(fn):
+            span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self._span(span_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def start_run(self):
+        """Begin collecting this thread's spans for one Streamlit rerun"""
+        if self.enabled:
+            self._local.run = []
+            self._local.depth = 0
+            self._local.run_started = time.perf_counter()
+
+    def run_spans(self):
+        """(name, ms, depth) spans recorded on this thread since start_run, and elapsed ms so far"""
+        run = getattr(self._local, "run", None)
+        if run is None:
+            return [], 0.0
+        return [tuple(entry) for entry in run], (time.perf_counter() - self._local.run_started) * 1000
+
+    def snapshot(self):
+        """{span: count, errors, total/avg/max ms, p50/p95 ms over the recent window}"""
+        with self._lock:
+            items = [(name, stats.count, stats.errors, stats.total_ms, stats.max_ms, sorted(stats.recent))
+                     for name, stats in self._stats.items()]
+        return {
+            name: {
+                "count": count,
+                "errors": errors,
+                "total_ms": total_ms,
+                "avg_ms": total_ms / count if count else 0.0,
+                "max_ms": max_ms,
+                "p50_ms": _percentile(ordered, 0.50),
+                "p95_ms": _percentile(ordered, 0.95),
+            }
+            for name, count, errors, total_ms, max_ms, ordered in sorted(items)
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix="fyn_span"):
+        """Prometheus text exposition: a summary per span (seconds) plus an error counter"""
+        lines = [
+            f"# HELP {prefix}_duration_seconds Time spent in instrumented spans",
+            f"# TYPE {prefix}_duration_seconds summary",
+        ]
+        snapshot = self.snapshot()
+        for name, stats in snapshot.items():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{prefix}_duration_seconds{{span="{label}",quantile="0.5"}} {stats["p50_ms"] / 1000:.6f}')
+            lines.append(f'{prefix}_duration_seconds{{span="{label}",quantile="0.95"}} {stats["p95_ms"] / 1000:.6f}')
+            lines.append(f'{prefix}_duration_seconds_sum{{span="{label}"}} {stats["total_ms"] / 1000:.6f}')
+            lines.append(f'{prefix}_duration_seconds_count{{span="{label}"}} {stats["count"]}')
+        lines.append(f"# HELP {prefix}_errors_total Spans that exited with an exception")
+        lines.append(f"# TYPE {prefix}_errors_total counter")
+        for name, stats in snapshot.items():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{prefix}_errors_total{{span="{label}"}} {stats["errors"]}')
+        return "\n".join(lines) + "\n"
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+RECORDER = Recorder()
+span = RECORDER.span
+timed = RECORDER.timed
+start_run = RECORDER.start_run
+run_spans = RECORDER.run_spans
+snapshot = RECORDER.snapshot
+to_json = RECORDER.to_json
+to_prometheus = RECORDER.to_prometheus
+
+
+def enabled():
+    return RECORDER.enabled
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port=METRICS_PORT, host="127.0.0.1"):
+    """Expose /metrics (Prometheus) and /metrics.json on a background thread, once per process"""
+    global _server
+    if not port or not RECORDER.enabled:
+        return None
+    with _server_lock:
+        if _server is None:
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.startswith("/metrics.json"):
+                        body, content_type = to_json().encode("utf-8"), "application/json"
+                    elif self.path.startswith("/metrics"):
+                        body, content_type = to_prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+                    else:
+                        self.send_error(404)
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            try:
+                _server = ThreadingHTTPServer((host, port), Handler)
+            except OSError:
+                return None  # another process on this host already serves the port
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
@@ -0,0 +1,174 @@
+import os
+import re
+import time
+import random
+import hashlib
+import threading
+from types import SimpleNamespace
+from dotenv import load_dotenv
+load_dotenv()
+
+# --- Config (overridable through .env) ---
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")   # "gemini" or "stub" (offline, for load tests)
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.5-flash")
+STUB_LATENCY_MS = float(os.getenv("LLM_STUB_LATENCY_MS", "400"))   # time to first token
+STUB_CHUNK_MS = float(os.getenv("LLM_STUB_CHUNK_MS", "30"))        # gap between streamed chunks
+STUB_FAILURE_RATE = float(os.getenv("LLM_STUB_FAILURE_RATE", "0"))
+STUB_SEED = int(os.getenv("LLM_STUB_SEED", "0"))
+
+
+class GeminiProvider:
+    """Google Gemini through the google-genai SDK"""
+
+    name = "gemini"
+
+    def __init__(self, model=LLM_MODEL, api_key=None):
+        # Imported here so the stub provider works without the SDK loaded
+        from google import genai
+        from google.genai import types
+        self.model = model
+        self._types = types
+        self._client = genai.Client(api_key=api_key or os.getenv("GEMINI_API_KEY"))
+
+    def generate(self, prompt, temperature=None, max_output_tokens=None, thinking_budget=None):
+        """Single-shot completion; returns the response text
+
+        thinking_budget=0 turns thinking off, so short replies aren't spent on thinking tokens.
+        """
+        response = self._client.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config=self._types.GenerateContentConfig(
+                temperature=temperature,
+                candidate_count=1,
+                max_output_tokens=max_output_tokens,
+                thinking_config=(
+                    self._types.ThinkingConfig(thinking_budget=thinking_budget)
+                    if thinking_budget is not None else None
+                ),
+            ),
+        )
+        return response.text
+
+    def create_chat(self, system_instruction):
+        """Multi-turn chat exposing send_message / send_message_stream"""
+        return self._client.chats.create(
+            model=self.model,
+            config=self._types.GenerateContentConfig(system_instruction=system_instruction),
+        )
+
+
+class StubProvider:
+    """Deterministic offline stand-in with simulated latency and failures.
+
+    Replies are derived from a hash of the prompt, so the same input always gives the same
+    output. Failures are drawn from a seeded RNG at `failure_rate`.
+    """
+
+    name = "stub"
+
+    PERSONAS = [("Thrifty Saver", "💰"), ("Foodie Adventurer", "🍕"), ("Coffee Connoisseur", "☕"),
+                ("Utility Warrior", "🏠"), ("Shopping Explorer", "🛍️"), ("Weekend Wanderer", "🚗")]
+
+    def __init__(self, model="stub", latency_ms=STUB_LATENCY_MS, chunk_ms=STUB_CHUNK_MS,
+                 failure_rate=STUB_FAILURE_RATE, seed=STUB_SEED):
+        self.model = model
+        self.latency_ms = latency_ms
+        self.chunk_ms = chunk_ms
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _maybe_fail(self):
+        with self._lock:
+            failed = self._rng.random() < self.failure_rate
+        if failed:
+            raise RuntimeError("stub provider: simulated failure")
+
+    @staticmethod
+    def _digest(text):
+        return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+    def _reply_for(self, prompt):
+        if "PERSONA_NAME" in prompt:
+            total = re.search(r"Total spent: \$([\d.]+)", prompt)
+            count = re.search(r"Transaction count: (\d+)", prompt)
+            name, emoji = self.PERSONAS[self._digest(prompt) % len(self.PERSONAS)]
+            total = float(total.group(1)) if total else 0.0
+            return (f"PERSONA_NAME: {name}\nEMOJI: {emoji}\n"
+                    f"STORY: This week you spent ${total:.0f} across {count.group(1) if count else 0} purchases. "
+                    f"Nice steady week! Try setting aside 20 dollars before the weekend.")
+        words = ["Based", "on", "your", "transactions,", "here", "is", "a", "quick", "summary.",
+                 "Your", "spending", "looks", "steady", "overall.", "Keep", "an", "eye", "on", "dining",
+                 "and", "coffee,", "which", "add", "up", "fastest."]
+        length = 12 + self._digest(prompt) % (len(words) - 12 + 1)
+        return " ".join(words[:length])
+
+    def _chunks(self, text, size=4):
+        words = text.split(" ")
+        return [" ".join(words[i:i + size]) + (" " if i + size < len(words) else "")
+                for i in range(0, len(words), size)]
+
+    def generate(self, prompt, temperature=None, max_output_tokens=None, thinking_budget=None):
+        time.sleep(self.latency_ms / 1000)
+        self._maybe_fail()
+        text = self._reply_for(prompt)
+        time.sleep(self.chunk_ms * (len(self._chunks(text)) - 1) / 1000)
+        return text
+
+    def create_chat(self, system_instruction):
+        return StubChat(self, system_instruction)
+
+
+class StubChat:
+    """Chat session for StubProvider with the same send_message(_stream) surface as a genai chat"""
+
+    def __init__(self, provider, system_instruction):
+        self.provider = provider
+        self.history = [system_instruction or ""]
+
+    def _usage(self, reply):
+        prompt_tokens = sum(len(part) for part in self.history) // 4
+        output_tokens = max(1, len(reply) // 4)
+        return SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=output_tokens,
+                               total_token_count=prompt_tokens + output_tokens)
+
+    def send_message_stream(self, message):
+        provider = self.provider
+        self.history.append(message)
+        time.sleep(provider.latency_ms / 1000)
+        provider._maybe_fail()
+        reply = provider._reply_for(message)
+        chunks = provider._chunks(reply)
+        usage = self._usage(reply)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(provider.chunk_ms / 1000)
+            last = i == len(chunks) - 1
+            if last:
+                self.history.append(reply)
+            # Like the real stream, only the final chunk carries usage metadata
+            yield SimpleNamespace(text=chunk, usage_metadata=usage if last else None)
+
+    def send_message(self, message):
+        chunks = list(self.send_message_stream(message))
+        return SimpleNamespace(text="".join(c.text for c in chunks), usage_metadata=chunks[-1].usage_metadata)
+
+
+PROVIDERS = {"gemini": GeminiProvider, "stub": StubProvider}
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """Process-wide LLM provider selected by LLM_PROVIDER, created on first use"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            try:
+                factory = PROVIDERS[LLM_PROVIDER]
+            except KeyError:
+                raise ValueError(f"Unknown LLM_PROVIDER {LLM_PROVIDER!r}; expected one of {sorted(PROVIDERS)}")
+            _provider = factory()
+        return _provider
@@ -0,0 +1,133 @@
+import re
+import threading
+import numpy as np
+from chat_context import match_question, match_mask
+
+# Questions that need judgement rather than arithmetic always go to the model
+OPEN_ENDED = re.compile(
+    r"\b(why|should|could|would|advice|advise|tips?|plan|budget|save|saving|savings|recommend|"
+    r"compare|help|reduce|cut|afford|invest|improve|better|worse|trend)\b"
+)
+TOP_CATEGORY = re.compile(
+    r"\b(biggest|largest|top|highest|main|most)\b.*\bcategor(y|ies)\b"
+    r"|\bwhat do i spend (the )?most on\b|\bwhere do i spend (the )?most\b"
+)
+LARGEST_PURCHASE = re.compile(
+    r"\b(largest|biggest|most expensive|highest|priciest)\b.*\b(purchase|transaction|expense|charge|payment)\b"
+)
+AVERAGE = re.compile(r"\baverage\b|\bper (day|purchase|transaction)\b")
+COUNT = re.compile(r"\bhow many\b.*\b(purchases|transactions|times|charges)\b")
+# Date phrases chat_context._date_window doesn't parse ("this year", "in 2024", "past 30 days",
+# "since June", "two weeks ago"...). Answering those over all time would be confidently wrong
+UNPARSED_DATES = re.compile(
+    r"\b(19|20)\d{2}\b|\b\d{1,2}/\d{1,2}\b|\b\d{1,2}(st|nd|rd|th)\b|\bq[1-4]\b"
+    r"|\b(years?|yearly|annual|annually|quarters?|weekends?|weekdays?|since|ago|before|after|until|till|between|ytd)\b"
+    r"|\b(past|last|previous|recent|first|next)\s+(\d+|few|couple|several|two|three|four|five|six|seven|eight|nine|ten|twelve)\b"
+    r"|\b(past|previous)\s+(days?|weeks?|months?)\b"
+    r"|\b(per|each|every|a)\s+(weeks?|months?)\b|\b(weekly|monthly)\b"
+)
+TOTAL = re.compile(r"\bhow much\b.*\b(spend|spent|spending)\b|\btotal\b.*\b(spend|spent|spending)\b|\bwhat did i spend\b")
+
+_stats = {"local": 0, "model": 0}
+_stats_lock = threading.Lock()
+
+
+def _money(amount):
+    return f"${amount:,.2f}"
+
+
+def _day(value):
+    return value.astype("datetime64[D]").astype(object).strftime("%b %d, %Y")
+
+
+def _window_label(window):
+    if window is None:
+        return "across your transaction history"
+    start, end = window
+    return f"between {_day(start)} and {_day(end - 1)}"
+
+
+def answer_locally(table, question, today=None):
+    """Plain-text answer for simple aggregation questions, or None to defer to the model"""
+    q = question.lower().strip()
+    if len(table) == 0 or OPEN_ENDED.search(q) or UNPARSED_DATES.search(q):
+        return None
+
+    match = match_question(table, q, today)
+    # Words we couldn't map to a category or merchant ("travel", "rent") mean the model
+    # should handle it, e.g. to explain the data isn't there
+    targeted = bool(match["category_codes"] or match["description_codes"])
+    if match["keywords"] and not targeted:
+        return None
+
+    mask = match_mask(table, match)
+    rows = np.flatnonzero(mask) if mask is not None else np.arange(len(table))
+    when = _window_label(match["window"])
+    if targeted:
+        names = [table.categories[c] for c in match["category_codes"]] or sorted(
+            {table.descriptions[d] for d in match["description_codes"]}
+        )
+        subject = " and ".join(names[:3])
+    else:
+        subject = None
+
+    if TOP_CATEGORY.search(q):
+        if not len(rows):
+            return f"I don't see any purchases {when}."
+        totals = np.bincount(table.category_codes[rows], weights=table.amounts[rows], minlength=len(table.categories))
+        order = [c for c in np.argsort(-totals) if totals[c] > 0]
+        if not order:
+            return f"I don't see any spending {when}."
+        grand_total = totals.sum()
+        top = order[0]
+        lines = [f"Your biggest expense category {when} is {table.categories[top]} at "
+                 f"{_money(totals[top])} ({totals[top] / grand_total:.0%} of {_money(grand_total)})."]
+        for c in order[1:4]:
+            lines.append(f"- {table.categories[c]}: {_money(totals[c])}")
+        return "\n".join(lines)
+
+    if LARGEST_PURCHASE.search(q):
+        if not len(rows):
+            return f"I don't see any purchases {when}."
+        top = rows[np.argmax(table.amounts[rows])]
+        return (f"Your largest purchase {when} was {table.descriptions[table.description_codes[top]]} "
+                f"for {_money(table.amounts[top])} on {_day(table.dates[top])}.")
+
+    if AVERAGE.search(q):
+        if not len(rows):
+            return f"I don't see any purchases {when}."
+        amounts = table.amounts[rows]
+        if re.search(r"\b(daily|per day|a day|each day)\b", q):
+            if match["window"] is not None:
+                days = int((match["window"][1] - match["window"][0]).astype(int))
+            else:
+                dated = table.dates[rows][~np.isnat(table.dates[rows])].astype("datetime64[D]")
+                days = int((dated.max() - dated.min()).astype(int)) + 1 if len(dated) else 1
+            return (f"You spent an average of {_money(amounts.sum() / max(days, 1))} per day "
+                    f"{when}, {_money(amounts.sum())} over {days} days.")
+        return (f"Your average purchase{' on ' + subject if subject else ''} {when} was "
+                f"{_money(amounts.mean())} across {len(amounts)} purchases.")
+
+    if COUNT.search(q):
+        return (f"You made {len(rows)} purchase{'s' if len(rows) != 1 else ''}"
+                f"{' on ' + subject if subject else ''} {when}, totaling {_money(table.amounts[rows].sum())}.")
+
+    if TOTAL.search(q):
+        if not len(rows):
+            return f"I don't see any {subject + ' ' if subject else ''}purchases {when}."
+        return (f"You spent {_money(table.amounts[rows].sum())}{' on ' + subject if subject else ''} "
+                f"{when}, across {len(rows)} purchase{'s' if len(rows) != 1 else ''}.")
+
+    return None
+
+
+def record_turn(served_locally):
+    """Count a chat turn as answered locally or by the model"""
+    with _stats_lock:
+        _stats["local" if served_locally else "model"] += 1
+
+
+def local_answer_stats():
+    """How many chat turns this process answered locally vs with the model"""
+    with _stats_lock:
+        return dict(_stats)
@@ -0,0 +1,142 @@
+"""Local stand-in for the Nessie API, serving synthetic customers for load testing.
+
+    python mock_nessie.py --customers 2000 --purchases 500 --write-ids customer_ids.txt
+    NESSIE_BASE_URL=http://127.0.0.1:8765 NESSIE_CUSTOMER_IDS_FILE=customer_ids.txt streamlit run home_page.py
+
+Serves GET /customers, /customers/{id}, /customers/{id}/accounts, /accounts/{id} and
+/accounts/{id}/purchases. The API key is accepted and ignored.
+"""
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import functools
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+from synthetic_data import SyntheticBank, parse_id
+
+ROUTES = [
+    (re.compile(r"^/customers/?$"), "customers"),
+    (re.compile(r"^/customers/([0-9a-f]{24})/?$"), "customer"),
+    (re.compile(r"^/customers/([0-9a-f]{24})/accounts/?$"), "customer_accounts"),
+    (re.compile(r"^/accounts/([0-9a-f]{24})/?$"), "account"),
+    (re.compile(r"^/accounts/([0-9a-f]{24})/purchases/?$"), "account_purchases"),
+]
+
+
+class MockNessie:
+    """Routes Nessie GETs to a SyntheticBank, with optional simulated latency and 5xx errors"""
+
+    def __init__(self, bank, latency_ms=0.0, error_rate=0.0, cache_size=256):
+        self.bank = bank
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self._rng = random.Random(bank.seed)
+        self._lock = threading.Lock()
+        # Purchase lists are the expensive responses; keep the most recent ones encoded
+        self._purchases_body = functools.lru_cache(maxsize=cache_size)(self._encode_purchases)
+
+    def _encode_purchases(self, index):
+        return json.dumps(self.bank.purchases(index)).encode("utf-8")
+
+    def _index(self, value, kind):
+        parsed = parse_id(value, self.bank.seed)
+        if parsed is None or parsed[0] != kind or parsed[1] >= self.bank.customers:
+            return None
+        return parsed[1]
+
+    def handle(self, path):
+        """(status, body bytes) for a GET path"""
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if self.error_rate:
+            with self._lock:
+                failed = self._rng.random() < self.error_rate
+            if failed:
+                return 503, b'{"code": 503, "message": "simulated outage"}'
+
+        for pattern, route in ROUTES:
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            return 404, b'{"code": 404, "message": "Not found"}'
+
+        if route == "customers":
+            return 200, json.dumps([self.bank.customer(i) for i in range(self.bank.customers)]).encode("utf-8")
+        kind = "customer" if route.startswith("customer") else "account"
+        index = self._index(match.group(1), kind)
+        if index is None:
+            return 404, json.dumps({"code": 404, "message": f"No {kind} with that id"}).encode("utf-8")
+        if route == "customer":
+            return 200, json.dumps(self.bank.customer(index)).encode("utf-8")
+        if route == "customer_accounts":
+            return 200, json.dumps(self.bank.accounts(index)).encode("utf-8")
+        if route == "account":
+            return 200, json.dumps(self.bank.accounts(index)[0]).encode("utf-8")
+        return 200, self._purchases_body(index)
+
+
+def make_handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API behind the pooled client
+
+        def do_GET(self):
+            status, body = mock.handle(urlsplit(self.path).path)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start(bank, host="127.0.0.1", port=0, latency_ms=0.0, error_rate=0.0):
+    """Serve a bank on a background thread; returns the server (base URL via server_url)"""
+    server = ThreadingHTTPServer((host, port), make_handler(MockNessie(bank, latency_ms, error_rate)))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def server_url(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--purchases", type=int, default=500, help="average purchases per customer")
+    parser.add_argument("--days", type=int, default=180, help="history length in days")
+    parser.add_argument("--end-date", help="last purchase date (YYYY-MM-DD), default today")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 503")
+    parser.add_argument("--write-ids", help="write customer ids here, one per line (for NESSIE_CUSTOMER_IDS_FILE)")
+    args = parser.parse_args(argv)
+
+    bank = SyntheticBank(args.customers, args.purchases, args.seed, args.end_date, args.days)
+    if args.write_ids:
+        with open(args.write_ids, "w") as f:
+            f.write("\n".join(bank.customer_ids()) + "\n")
+    server = start(bank, args.host, args.port, args.latency_ms, args.error_rate)
+    print(f"Mock Nessie on {server_url(server)}: {args.customers} customers, "
+          f"~{args.customers * args.purchases:,} purchases", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
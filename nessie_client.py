@@ -0,0 +1,103 @@
+import os
+import time
+import threading
+from collections import defaultdict
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+load_dotenv()
+
+# --- Config (overridable through .env) ---
+NESSIE_KEY = os.getenv("NESSIE_KEY")
+BASE_URL = os.getenv("NESSIE_BASE_URL", "http://api.nessieisreal.com")  # point at mock_nessie.py for load tests
+POOL_SIZE = int(os.getenv("NESSIE_POOL_SIZE", "10"))
+CONNECT_TIMEOUT = float(os.getenv("NESSIE_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("NESSIE_READ_TIMEOUT", "10"))
+MAX_RETRIES = int(os.getenv("NESSIE_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("NESSIE_BACKOFF_FACTOR", "0.3"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class NessieClient:
+    """Pooled, retrying HTTP client for the Nessie API"""
+
+    def __init__(self, base_url=BASE_URL, api_key=NESSIE_KEY, pool_size=POOL_SIZE,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), max_retries=MAX_RETRIES,
+                 backoff_factor=BACKOFF_FACTOR):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+
+        # Retry idempotent GETs on throttling / server errors with exponential backoff
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,  # hand the final response back instead of raising
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._latency = defaultdict(lambda: {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+
+    def get(self, path, endpoint=None, **params):
+        """GET a Nessie path, recording latency under the endpoint name"""
+        params["key"] = self.api_key
+        endpoint = endpoint or path
+        start = time.perf_counter()
+        try:
+            response = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+        except requests.RequestException:
+            self._record(endpoint, start, error=True)
+            raise
+        self._record(endpoint, start, error=response.status_code >= 400)
+        return response
+
+    def get_accounts(self, customer_id):
+        """List the accounts belonging to a customer"""
+        return self.get(f"/customers/{customer_id}/accounts", endpoint="customer_accounts")
+
+    def get_purchases(self, account_id):
+        """List the purchases made from an account"""
+        return self.get(f"/accounts/{account_id}/purchases", endpoint="account_purchases")
+
+    def _record(self, endpoint, start, error=False):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            stats = self._latency[endpoint]
+            stats["count"] += 1
+            stats["errors"] += int(error)
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def latency_stats(self):
+        """Snapshot of per-endpoint request counts and latencies"""
+        with self._lock:
+            snapshot = {}
+            for endpoint, stats in self._latency.items():
+                snapshot[endpoint] = dict(stats)
+                snapshot[endpoint]["avg_ms"] = stats["total_ms"] / stats["count"] if stats["count"] else 0.0
+            return snapshot
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide NessieClient so every caller shares one connection pool"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = NessieClient()
+    return _client
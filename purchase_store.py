@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import numpy as np
+from dotenv import load_dotenv
+from categorizer import CATEGORIZER
+load_dotenv()
+
+# --- Config (overridable through .env) ---
+STORE_PATH = os.getenv("PURCHASE_STORE_PATH", os.path.join(os.path.dirname(__file__), "purchases.db"))
+SYNC_INTERVAL = float(os.getenv("PURCHASE_SYNC_INTERVAL", "60"))  # seconds between Nessie syncs
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS purchases (
+    account_id TEXT NOT NULL,
+    purchase_id TEXT NOT NULL,
+    purchase_date TEXT,
+    amount REAL,
+    description TEXT,
+    merchant_id TEXT,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (account_id, purchase_id)
+);
+CREATE INDEX IF NOT EXISTS purchases_by_date ON purchases (account_id, purchase_date);
+CREATE TABLE IF NOT EXISTS sync_state (
+    account_id TEXT PRIMARY KEY,
+    customer_id TEXT,
+    last_synced_at REAL,
+    watermark TEXT
+);
+CREATE TABLE IF NOT EXISTS daily_totals (
+    account_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL,
+    purchases INTEGER NOT NULL,
+    PRIMARY KEY (account_id, day, category)
+);
+CREATE TABLE IF NOT EXISTS daily_totals_state (
+    account_id TEXT PRIMARY KEY,
+    rules_key TEXT
+);
+"""
+
+
+def _day(purchase_date):
+    """YYYY-MM-DD for a stored purchase_date, '' when it can't be parsed (NaT in the table)"""
+    try:
+        day = str(np.datetime64(purchase_date, "D"))
+    except (ValueError, TypeError):
+        return ""
+    return "" if day == "NaT" else day
+
+
+class PurchaseStore:
+    """Local SQLite copy of each account's purchases, synced incrementally from Nessie"""
+
+    def __init__(self, path=STORE_PATH, sync_interval=SYNC_INTERVAL, categorizer=CATEGORIZER):
+        self.path = path
+        self.sync_interval = sync_interval
+        self.categorizer = categorizer
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # One connection per thread; sqlite3 connections can't be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def needs_sync(self, account_id):
+        """True when the account was never synced or its last sync is older than the interval"""
+        row = self._connect().execute(
+            "SELECT last_synced_at FROM sync_state WHERE account_id = ?", (account_id,)
+        ).fetchone()
+        return row is None or row[0] is None or time.time() - row[0] >= self.sync_interval
+
+    def has_account(self, account_id):
+        row = self._connect().execute(
+            "SELECT 1 FROM sync_state WHERE account_id = ?", (account_id,)
+        ).fetchone()
+        return row is not None
+
+    def account_for(self, customer_id):
+        """Last account synced for a customer, used when Nessie can't be reached"""
+        row = self._connect().execute(
+            "SELECT account_id FROM sync_state WHERE customer_id = ? ORDER BY last_synced_at DESC",
+            (customer_id,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def sync(self, account_id, purchases, customer_id=None):
+        """Write new and changed purchases and drop ones Nessie no longer returns"""
+        remote = {}
+        for purchase in purchases:
+            purchase["status"] = "executed"
+            remote[purchase["_id"]] = purchase
+        conn = self._connect()
+        with self._write_lock, conn:
+            stored = dict(conn.execute(
+                "SELECT purchase_id, payload FROM purchases WHERE account_id = ?", (account_id,)
+            ))
+            removed_ids = stored.keys() - remote.keys()
+
+            # A purchase edited upstream keeps its _id, so the stored JSON is compared to spot it
+            rows, new_ids, changed_ids = [], [], []
+            for purchase_id, purchase in remote.items():
+                payload = json.dumps(purchase)
+                previous = stored.get(purchase_id)
+                if previous == payload:
+                    continue
+                (new_ids if previous is None else changed_ids).append(purchase_id)
+                rows.append((
+                    account_id, purchase_id, purchase.get("purchase_date"), purchase.get("amount"),
+                    purchase.get("description"), purchase.get("merchant_id"), payload,
+                ))
+
+            # Removed and changed purchases are read back first so their old amounts leave the daily totals
+            removed = []
+            for purchase_id in [*removed_ids, *changed_ids]:
+                removed.extend(conn.execute(
+                    "SELECT purchase_date, description, merchant_id, COALESCE(amount, 0), 1 FROM purchases "
+                    "WHERE account_id = ? AND purchase_id = ?",
+                    (account_id, purchase_id),
+                ))
+
+            conn.executemany("INSERT OR REPLACE INTO purchases VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany(
+                "DELETE FROM purchases WHERE account_id = ? AND purchase_id = ?",
+                [(account_id, purchase_id) for purchase_id in removed_ids],
+            )
+            if self._totals_current(conn, account_id):
+                self._apply_totals(conn, account_id, [(row[2], row[4], row[5], row[3] or 0.0, 1) for row in rows], removed)
+            else:
+                self._rebuild_totals(conn, account_id)
+
+            watermark = conn.execute(
+                "SELECT MAX(purchase_date) FROM purchases WHERE account_id = ?", (account_id,)
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, COALESCE(?, (SELECT customer_id FROM sync_state WHERE account_id = ?)), ?, ?)",
+                (account_id, customer_id, account_id, time.time(), watermark),
+            )
+        return {"inserted": len(new_ids), "updated": len(changed_ids), "removed": len(removed_ids), "watermark": watermark}
+
+    def read_purchases(self, account_id):
+        """Stored purchases for an account, newest first"""
+        rows = self._connect().execute(
+            "SELECT payload FROM purchases WHERE account_id = ? ORDER BY purchase_date DESC",
+            (account_id,),
+        )
+        return [json.loads(payload) for (payload,) in rows]
+
+    def read_columns(self, account_id):
+        """Stored purchases as parallel (ids, dates, amounts, descriptions, merchant_ids) columns"""
+        rows = self._connect().execute(
+            "SELECT purchase_id, purchase_date, amount, description, merchant_id FROM purchases "
+            "WHERE account_id = ? ORDER BY purchase_date DESC",
+            (account_id,),
+        ).fetchall()
+        if not rows:
+            return [], [], [], [], []
+        return [list(column) for column in zip(*rows)]
+
+    def read_daily_totals(self, account_id):
+        """Per-day x category (days, categories, amounts, purchase counts) columns, oldest day first"""
+        conn = self._connect()
+        if not self._totals_current(conn, account_id):
+            # Stored before daily totals existed, or categorized under different rules
+            with self._write_lock, conn:
+                self._rebuild_totals(conn, account_id)
+        rows = conn.execute(
+            "SELECT day, category, amount, purchases FROM daily_totals WHERE account_id = ? ORDER BY day, category",
+            (account_id,),
+        ).fetchall()
+        if not rows:
+            return [], [], [], []
+        return [list(column) for column in zip(*rows)]
+
+    def _totals_current(self, conn, account_id):
+        row = conn.execute(
+            "SELECT rules_key FROM daily_totals_state WHERE account_id = ?", (account_id,)
+        ).fetchone()
+        return row is not None and row[0] == self.categorizer.key
+
+    def _apply_totals(self, conn, account_id, added, removed):
+        """Add/subtract (purchase_date, description, merchant_id, amount, count) rows into daily_totals"""
+        # First sync of a long history is mostly repeats: parse each date and categorize each pair once
+        days, categories, deltas = {}, {}, {}
+        for sign, groups in ((1, added), (-1, removed)):
+            for purchase_date, description, merchant_id, amount, count in groups:
+                day = days.get(purchase_date)
+                if day is None:
+                    day = days[purchase_date] = _day(purchase_date)
+                category = categories.get((description, merchant_id))
+                if category is None:
+                    category = categories[description, merchant_id] = self.categorizer.categorize(description or "", merchant_id)
+                delta = deltas.get((day, category))
+                if delta is None:
+                    delta = deltas[day, category] = [0.0, 0]
+                delta[0] += sign * amount
+                delta[1] += sign * count
+        conn.executemany(
+            "INSERT INTO daily_totals VALUES (?, ?, ?, ?, ?) ON CONFLICT (account_id, day, category) "
+            "DO UPDATE SET amount = amount + excluded.amount, purchases = purchases + excluded.purchases",
+            [(account_id, day, category, amount, count) for (day, category), (amount, count) in deltas.items()],
+        )
+        conn.execute("DELETE FROM daily_totals WHERE account_id = ? AND purchases <= 0", (account_id,))
+
+    def _rebuild_totals(self, conn, account_id):
+        """Recompute an account's daily totals from its stored purchases"""
+        conn.execute("DELETE FROM daily_totals WHERE account_id = ?", (account_id,))
+        # SQLite collapses repeats first, so only distinct (date, description, merchant) rows are categorized
+        groups = conn.execute(
+            "SELECT purchase_date, description, merchant_id, TOTAL(amount), COUNT(*) FROM purchases "
+            "WHERE account_id = ? GROUP BY purchase_date, description, merchant_id",
+            (account_id,),
+        ).fetchall()
+        self._apply_totals(conn, account_id, groups, [])
+        conn.execute("INSERT OR REPLACE INTO daily_totals_state VALUES (?, ?)", (account_id, self.categorizer.key))
+
+    def watermark(self, account_id):
+        row = self._connect().execute(
+            "SELECT watermark FROM sync_state WHERE account_id = ?", (account_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Process-wide PurchaseStore, opened on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PurchaseStore()
+    return _store
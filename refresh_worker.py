@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+import get_transactions
+from transaction_cache import TRANSACTIONS
+from weekly_stats import recent_weeks
+from weekly_journal import generate_journal_entries, JOURNAL_WEEKS
+from llm_provider import get_provider
+from instrumentation import span
+load_dotenv()
+
+# --- Config (overridable through .env) ---
+ENABLED = os.getenv("REFRESH_WORKER", "0").lower() in ("1", "true", "yes")
+REFRESH_INTERVAL = float(os.getenv("REFRESH_INTERVAL", "240"))      # seconds; keep below TRANSACTION_CACHE_TTL
+REFRESH_JITTER = float(os.getenv("REFRESH_JITTER", "30"))           # up to this many extra seconds per cycle
+REFRESH_CONCURRENCY = int(os.getenv("REFRESH_CONCURRENCY", "2"))    # customers refreshed at once
+REFRESH_ACTIVE_TTL = float(os.getenv("REFRESH_ACTIVE_TTL", "3600"))  # seconds a customer stays active after a visit
+REFRESH_JOURNAL = os.getenv("REFRESH_JOURNAL", "1").lower() in ("1", "true", "yes")
+
+
+class RefreshWorker:
+    """Keeps active customers' transactions and journal stories warm in the shared caches"""
+
+    def __init__(self, interval=REFRESH_INTERVAL, jitter=REFRESH_JITTER, concurrency=REFRESH_CONCURRENCY,
+                 active_ttl=REFRESH_ACTIVE_TTL, journal=REFRESH_JOURNAL, customers=None):
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.active_ttl = active_ttl
+        self.journal = journal
+        self.customers = customers  # fixed customer indexes; None means whoever was active recently
+        self._active = {}           # customer index -> monotonic time of last visit
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"cycles": 0, "refreshed": 0, "errors": 0, "last_cycle_ms": 0.0, "last_cycle_at": None}
+
+    def mark_active(self, id):
+        """Record a visit to customer index id so the next cycles refresh it"""
+        with self._lock:
+            self._active[id] = time.monotonic()
+
+    def active_customers(self):
+        if self.customers is not None:
+            return list(self.customers)
+        cutoff = time.monotonic() - self.active_ttl
+        with self._lock:
+            for id in [id for id, seen in self._active.items() if seen < cutoff]:
+                del self._active[id]
+            return sorted(self._active)
+
+    def refresh_customer(self, id):
+        """Reload one customer's table and daily totals, then generate any journal stories not on disk yet"""
+        with span("refresh.customer"):
+            # Loaded first and swapped in after, so readers keep hitting the old entry meanwhile
+            table = get_transactions.fetch_table_uncached(id, force_sync=True)
+            TRANSACTIONS.put(id, table)
+            TRANSACTIONS.put(("totals", id), get_transactions.fetch_totals_uncached(id))
+            # Purchase dicts are rarely asked for, so they're reloaded on next use rather than prewarmed
+            TRANSACTIONS.invalidate(("records", id))
+        if self.journal:
+            # Same weeks the dashboard asks for; closed weeks are disk-cache hits, so
+            # normally only the current week reaches the model
+            with span("refresh.journal"):
+                for _ in generate_journal_entries(get_provider(), recent_weeks(table, count=JOURNAL_WEEKS),
+                                                  max_workers=1):
+                    pass
+
+    def run_cycle(self):
+        """Refresh every active customer once, at most concurrency at a time; returns (refreshed, errors)"""
+        customers = self.active_customers()
+        start = time.perf_counter()
+        refreshed = errors = 0
+        if customers:
+            with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as pool:
+                for future in [pool.submit(self.refresh_customer, id) for id in customers]:
+                    try:
+                        future.result()
+                        refreshed += 1
+                    except Exception:
+                        # Nessie or the model being down only delays the refresh to the next cycle
+                        errors += 1
+        with self._lock:
+            self._stats["cycles"] += 1
+            self._stats["refreshed"] += refreshed
+            self._stats["errors"] += errors
+            self._stats["last_cycle_ms"] = (time.perf_counter() - start) * 1000
+            self._stats["last_cycle_at"] = time.time()
+        return refreshed, errors
+
+    def _loop(self):
+        # Jitter keeps several app processes from refreshing in lockstep
+        while not self._stop.wait(self.interval + random.uniform(0, self.jitter)):
+            self.run_cycle()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="refresh-worker", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["active"] = len(self._active) if self.customers is None else len(self.customers)
+            stats["running"] = self._thread is not None and self._thread.is_alive()
+            return stats
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker():
+    """Process-wide RefreshWorker (not started until start_worker)"""
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = RefreshWorker()
+    return _worker
+
+
+def start_worker():
+    """Start the background refresh thread once per process when REFRESH_WORKER is set"""
+    if not ENABLED:
+        return None
+    return get_worker().start()
+
+
+def mark_active(id):
+    get_worker().mark_active(id)
+
+
+def worker_stats():
+    return get_worker().stats()
+
+
+def main(argv=None):
+    """Run the refresher as its own process; it warms the shared SQLite store and journal disk cache"""
+    parser = argparse.ArgumentParser(description="Refresh Nessie purchases and journal stories in the background")
+    parser.add_argument("--customers", type=int, nargs="+", help="customer indexes (default: all configured)")
+    parser.add_argument("--interval", type=float, default=REFRESH_INTERVAL)
+    parser.add_argument("--jitter", type=float, default=REFRESH_JITTER)
+    parser.add_argument("--concurrency", type=int, default=REFRESH_CONCURRENCY)
+    parser.add_argument("--no-journal", action="store_true")
+    parser.add_argument("--once", action="store_true", help="run one cycle and exit")
+    args = parser.parse_args(argv)
+
+    customers = args.customers if args.customers is not None else list(range(len(get_transactions.CUSTOMER_IDS)))
+    worker = RefreshWorker(interval=args.interval, jitter=args.jitter, concurrency=args.concurrency,
+                           journal=not args.no_journal, customers=customers)
+    while True:
+        refreshed, errors = worker.run_cycle()
+        print(f"refreshed {refreshed} customers, {errors} errors in {worker.stats()['last_cycle_ms']:.0f} ms",
+              flush=True)
+        if args.once:
+            return 1 if errors else 0
+        time.sleep(args.interval + random.uniform(0, args.jitter))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
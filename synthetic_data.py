@@ -0,0 +1,168 @@
+import datetime
+import numpy as np
+
+# Nessie-style 24-hex ids that encode (kind, index) so a server can answer any id without storing it:
+# customers "<seed:04x>c1<index:018x>", accounts "<seed:04x>a1<index:018x>", merchants "<seed:04x>d1<index:018x>"
+KINDS = {"customer": "c1", "account": "a1", "merchant": "d1"}
+
+# (category, merchant, median amount, relative frequency) for day-to-day spending
+CATALOG = [
+    ("Dining", "Chipotle", 14.0, 6), ("Dining", "Panera Bread", 16.0, 4), ("Dining", "Olive Garden", 42.0, 2),
+    ("Dining", "DoorDash", 31.0, 3), ("Coffee", "Starbucks", 6.5, 9), ("Coffee", "Dunkin", 5.0, 5),
+    ("Groceries", "Kroger", 68.0, 5), ("Groceries", "Trader Joe's", 54.0, 4), ("Groceries", "Costco", 135.0, 1),
+    ("Gas", "Shell", 42.0, 4), ("Gas", "Exxon", 45.0, 3), ("Transportation", "Uber", 19.0, 3),
+    ("Shopping", "Target", 48.0, 4), ("Shopping", "Amazon", 36.0, 6), ("Shopping", "Best Buy", 120.0, 1),
+    ("Entertainment", "AMC Theatres", 24.0, 1), ("Entertainment", "Steam", 20.0, 1),
+    ("Health", "CVS Pharmacy", 22.0, 2), ("Health", "Planet Fitness", 25.0, 1),
+    ("Gifts", "Etsy", 38.0, 1),
+]
+# Monthly bills: (category, merchant, day of month, median amount)
+BILLS = [
+    ("Housing", "Rent", 1, 1450.0),
+    ("Utilities", "Duke Energy", 15, 110.0),
+    ("Utilities", "Comcast Internet", 20, 75.0),
+    ("Subscriptions", "Netflix", 8, 15.49),
+    ("Subscriptions", "Spotify", 12, 10.99),
+]
+MERCHANTS = [(category, name) for category, name, _, _ in CATALOG] + [(category, name) for category, name, _, _ in BILLS]
+SEPARATOR = " — "  # matches the categorizer's default "Category — Merchant" descriptions
+# Day-to-day spending is drawn in fixed blocks of days counted from 1970-01-01, so a day's purchases
+# don't depend on which window (end_date, days) is asked for
+BLOCK_DAYS = 64
+BILL_SEQUENCE = 1 << 31  # per-day sequence numbers for bills start here, after any day-to-day purchase
+
+
+def make_id(kind, index, seed=0):
+    return f"{seed:04x}{KINDS[kind]}{index:018x}"
+
+
+def parse_id(value, seed=0):
+    """(kind, index) for an id made by make_id with this seed, else None"""
+    if len(value) != 24 or not value.startswith(f"{seed:04x}"):
+        return None
+    kinds = {code: kind for kind, code in KINDS.items()}
+    kind = kinds.get(value[4:6])
+    try:
+        return (kind, int(value[6:], 16)) if kind else None
+    except ValueError:
+        return None
+
+
+class SyntheticBank:
+    """Deterministic synthetic customers, accounts and purchases, generated on demand.
+
+    Nothing is stored: customer i's purchases on a day are a pure function of (seed, i, day), so
+    millions of purchases across thousands of customers cost no memory until requested, and a window
+    that slides forward with end_date keeps the ids and values of the days it still covers.
+    """
+
+    def __init__(self, customers=1000, purchases_per_customer=500, seed=0, end_date=None, days=180):
+        self.customers = customers
+        self.purchases_per_customer = purchases_per_customer
+        self.seed = seed
+        self.end_date = np.datetime64(end_date or datetime.date.today().isoformat(), "D")
+        self.days = days
+
+    def customer(self, index):
+        rng = np.random.default_rng([self.seed, index, 1])
+        first = ["Alicia", "Ben", "Chen", "Dana", "Eli", "Fatima", "Gabe", "Hana", "Ivan", "Jo"]
+        last = ["Rivera", "Smith", "Nguyen", "Okafor", "Patel", "Kim", "Garcia", "Cohen", "Silva", "Lee"]
+        return {
+            "_id": make_id("customer", index, self.seed),
+            "first_name": first[rng.integers(len(first))],
+            "last_name": last[rng.integers(len(last))],
+            "address": {"street_number": str(rng.integers(1, 9999)), "street_name": "Main St",
+                        "city": "Richmond", "state": "VA", "zip": "23220"},
+        }
+
+    def accounts(self, index):
+        rng = np.random.default_rng([self.seed, index, 2])
+        return [{
+            "_id": make_id("account", index, self.seed),
+            "type": "Checking",
+            "nickname": "Everyday Checking",
+            "rewards": 0,
+            "balance": int(rng.integers(500, 20000)),
+            "customer_id": make_id("customer", index, self.seed),
+        }]
+
+    def purchase_columns(self, index):
+        """(ids, dates, amounts, descriptions, merchant_ids) for one customer, oldest first"""
+        rng = np.random.default_rng([self.seed, index, 3])
+        start = self.end_date - self.days + 1
+
+        # Each customer has their own taste over the catalog and rent level
+        weights = np.array([frequency for _, _, _, frequency in CATALOG], dtype=float)
+        weights *= rng.gamma(1.0, 1.0, len(CATALOG))
+        weights /= weights.sum()
+        rent = float(np.round(rng.uniform(900, 2200), 2))
+        months = max(1, round(self.days / 30))
+        daily_rate = max(0, self.purchases_per_customer - len(BILLS) * months) / self.days
+
+        columns = [self._spending_block(index, block, weights, daily_rate)
+                   for block in range(start.astype(np.int64) // BLOCK_DAYS,
+                                      self.end_date.astype(np.int64) // BLOCK_DAYS + 1)]
+        dates, sequence, merchant, amounts = (np.concatenate(column) for column in zip(*columns))
+        in_window = (dates >= start) & (dates <= self.end_date)
+        dates, sequence, merchant, amounts = dates[in_window], sequence[in_window], merchant[in_window], amounts[in_window]
+
+        # Monthly bills on fixed days, with amounts drawn per month
+        bill_dates, bill_sequence, bill_merchants, bill_amounts = [], [], [], []
+        month = start.astype("datetime64[M]")
+        while month <= self.end_date.astype("datetime64[M]"):
+            month_rng = np.random.default_rng([self.seed, index, 4, int(month.astype(np.int64)) % 2**32])
+            variation = month_rng.lognormal(0.0, 0.1, len(BILLS))
+            for b, (_, name, day, median) in enumerate(BILLS):
+                date = month.astype("datetime64[D]") + (day - 1)
+                if start <= date <= self.end_date:
+                    bill_dates.append(date)
+                    bill_sequence.append(BILL_SEQUENCE + b)
+                    bill_merchants.append(len(CATALOG) + b)
+                    bill_amounts.append(rent if name == "Rent" else round(median * variation[b], 2))
+            month += 1
+
+        dates = np.concatenate([dates, np.array(bill_dates, dtype="datetime64[D]")])
+        sequence = np.concatenate([sequence, np.array(bill_sequence, dtype=np.int64)])
+        merchant = np.concatenate([merchant, np.array(bill_merchants, dtype=np.int64)])
+        amounts = np.concatenate([amounts, np.array(bill_amounts, dtype=float)])
+        order = np.lexsort((sequence, dates))
+        dates, sequence, merchant, amounts = dates[order], sequence[order], merchant[order], amounts[order]
+
+        # Ids encode customer, day and the purchase's number within that day, so they're unique
+        # across the whole bank and stay the same whatever window the day is generated in
+        ids = [f"{index:010x}{day:06x}{k:08x}" for day, k in zip(dates.astype(np.int64).tolist(), sequence.tolist())]
+        descriptions = [f"{MERCHANTS[m][0]}{SEPARATOR}{MERCHANTS[m][1]}" for m in merchant.tolist()]
+        merchant_ids = [make_id("merchant", m, self.seed) for m in merchant.tolist()]
+        return ids, np.datetime_as_string(dates, unit="D").tolist(), amounts.tolist(), descriptions, merchant_ids
+
+    def _spending_block(self, index, block, weights, daily_rate):
+        """(dates, per-day sequence, catalog indexes, amounts) of day-to-day purchases for one block of days"""
+        # Seed entropy must be non-negative; blocks before 1970 wrap around
+        rng = np.random.default_rng([self.seed, index, 3, block % 2**32])
+        days = np.datetime64(block * BLOCK_DAYS, "D") + np.arange(BLOCK_DAYS)
+        # A little more activity on weekends, same average rate overall
+        weekend = (days.astype(np.int64) + 3) % 7 >= 5
+        day_rates = np.where(weekend, 1.4, 1.0) * daily_rate * 7 / (5 + 2 * 1.4)
+        counts = rng.poisson(day_rates)
+        total = int(counts.sum())
+        dates = np.repeat(days, counts)
+        sequence = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        merchant = rng.choice(len(CATALOG), size=total, p=weights)
+        # Log-normal amounts around each merchant's median
+        medians = np.array([median for _, _, median, _ in CATALOG])[merchant]
+        amounts = np.round(medians * rng.lognormal(0.0, 0.35, total), 2)
+        return dates, sequence, merchant, amounts
+
+    def purchases(self, index):
+        """One customer's purchases in the Nessie /accounts/{id}/purchases shape"""
+        account_id = make_id("account", index, self.seed)
+        ids, dates, amounts, descriptions, merchant_ids = self.purchase_columns(index)
+        return [
+            {"_id": _id, "type": "merchant", "merchant_id": merchant_id, "payer_id": account_id,
+             "purchase_date": date, "amount": amount, "status": "executed", "medium": "balance",
+             "description": description}
+            for _id, date, amount, description, merchant_id in zip(ids, dates, amounts, descriptions, merchant_ids)
+        ]
+
+    def customer_ids(self):
+        return [make_id("customer", i, self.seed) for i in range(self.customers)]
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app is a set of top-level modules; make them importable however pytest is started
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
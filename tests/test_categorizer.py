@@ -0,0 +1,25 @@
+from categorizer import Categorizer
+from purchase_store import PurchaseStore
+from transaction_table import TransactionTable
+
+
+def test_blank_description_gets_default_category():
+    categorizer = Categorizer()
+    assert categorizer.categorize(" ") == "Other"
+    assert categorizer.categorize("") == "Other"
+    assert categorizer.categorize("Coffee — Starbucks") == "Coffee"
+    assert categorizer.categorize("Starbucks Reserve") == "Starbucks"
+
+
+def test_blank_description_does_not_break_ingest(tmp_path):
+    purchases = [
+        {"_id": "p1", "purchase_date": "2025-09-01", "amount": 5.0, "description": " ", "merchant_id": "m1"},
+        {"_id": "p2", "purchase_date": "2025-09-01", "amount": 7.5, "description": "Dining — Chipotle", "merchant_id": "m2"},
+    ]
+    table = TransactionTable.from_records(purchases)
+    assert sorted(table.category_column()) == ["Dining", "Other"]
+
+    store = PurchaseStore(path=str(tmp_path / "purchases.db"))
+    assert store.sync("a1", purchases)["inserted"] == 2
+    days, categories, amounts, counts = store.read_daily_totals("a1")
+    assert dict(zip(categories, amounts)) == {"Dining": 7.5, "Other": 5.0}
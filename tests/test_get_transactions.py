@@ -0,0 +1,63 @@
+import pytest
+
+import get_transactions
+import mock_nessie
+import nessie_client
+import purchase_store
+from account_ids import ACCOUNTS
+from synthetic_data import SyntheticBank
+from transaction_cache import TRANSACTIONS
+
+
+@pytest.fixture
+def nessie(tmp_path, monkeypatch):
+    """Mock Nessie with one synthetic customer and a fresh store; counts purchase requests"""
+    bank = SyntheticBank(customers=1, purchases_per_customer=200, end_date="2025-10-01")
+    server = mock_nessie.start(bank)
+    client = nessie_client.NessieClient(base_url=mock_nessie.server_url(server))
+    calls = []
+    get_purchases = client.get_purchases
+
+    def counting_get_purchases(account_id):
+        calls.append(account_id)
+        return get_purchases(account_id)
+
+    monkeypatch.setattr(client, "get_purchases", counting_get_purchases)
+    monkeypatch.setattr(nessie_client, "_client", client)
+    monkeypatch.setattr(get_transactions, "CUSTOMER_IDS", bank.customer_ids())
+    monkeypatch.setattr(purchase_store, "_store", purchase_store.PurchaseStore(path=str(tmp_path / "purchases.db")))
+    ACCOUNTS.invalidate()
+    TRANSACTIONS.invalidate()
+    yield calls
+    TRANSACTIONS.invalidate()
+    ACCOUNTS.invalidate()
+    server.shutdown()
+    client.close()
+
+
+def test_fetch_trans_is_cached_and_keeps_every_field(nessie, monkeypatch):
+    loads = []
+    load = get_transactions.fetch_trans_uncached
+    monkeypatch.setattr(get_transactions, "fetch_trans_uncached", lambda id, **kwargs: loads.append(id) or load(id, **kwargs))
+
+    records = get_transactions.fetch_trans(0)
+    assert get_transactions.fetch_trans(0) is records
+    assert loads == [0]
+    assert {"type", "medium", "payer_id", "status"} <= records[0].keys()
+
+    get_transactions.fetch_trans(0, refresh=True)
+    assert loads == [0, 0]
+
+
+def test_refresh_syncs_with_nessie_inside_the_sync_interval(nessie):
+    get_transactions.fetch_table(0)
+    assert len(nessie) == 1
+
+    # A plain cache miss inside PURCHASE_SYNC_INTERVAL reads the store without asking Nessie
+    TRANSACTIONS.invalidate()
+    get_transactions.fetch_table(0)
+    assert len(nessie) == 1
+
+    for fetch in (get_transactions.fetch_table, get_transactions.fetch_totals, get_transactions.fetch_trans):
+        fetch(0, refresh=True)
+    assert len(nessie) == 4
@@ -0,0 +1,46 @@
+import pytest
+
+from local_answers import answer_locally
+from transaction_table import TransactionTable
+
+TODAY = "2025-10-15"
+
+
+@pytest.fixture
+def table():
+    purchases = [
+        ("2024-03-02", 40.0, "Dining — Chipotle"),
+        ("2025-01-10", 25.0, "Dining — Panera Bread"),
+        ("2025-09-05", 12.0, "Dining — Chipotle"),
+        ("2025-09-20", 80.0, "Groceries — Kroger"),
+        ("2025-10-03", 6.5, "Coffee — Starbucks"),
+    ]
+    return TransactionTable.from_records([
+        {"_id": f"p{i}", "purchase_date": date, "amount": amount, "description": description, "merchant_id": f"m{i}"}
+        for i, (date, amount, description) in enumerate(purchases)
+    ])
+
+
+@pytest.mark.parametrize("question", [
+    "How much did I spend this year?",
+    "How much did I spend on dining in 2024?",
+    "How much did I spend last year?",
+    "How much did I spend in the past 30 days?",
+    "What did I spend in the last 3 months?",
+    "How much have I spent since June?",
+    "What did I spend two weeks ago?",
+    "How many purchases did I make on weekends?",
+    "How much do I spend per month on dining?",
+])
+def test_unparsed_date_phrases_go_to_the_model(table, question):
+    assert answer_locally(table, question, today=TODAY) is None
+
+
+def test_parsed_windows_are_answered_locally(table):
+    answer = answer_locally(table, "How much did I spend on dining last month?", today=TODAY)
+    assert answer.startswith("You spent $12.00 on Dining between Sep 01, 2025 and Sep 30, 2025")
+
+
+def test_all_time_total_is_answered_locally(table):
+    answer = answer_locally(table, "How much have I spent in total?", today=TODAY)
+    assert answer.startswith("You spent $163.50 across your transaction history")
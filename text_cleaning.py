@@ -0,0 +1,76 @@
+import re
+import threading
+from collections import OrderedDict
+
+# --- Patterns are compiled once at import ---
+# LaTeX math delimiters: $$...$$ then $...$
+_DISPLAY_MATH = re.compile(r'\$\$[^$]*\$\$')
+_INLINE_MATH = re.compile(r'\$[^$]*\$')
+# LaTeX commands: \command{...} then bare \command
+_COMMAND_WITH_ARG = re.compile(r'\\[a-zA-Z]+\{[^}]*\}')
+_COMMAND = re.compile(r'\\[a-zA-Z]+')
+# Mathematical symbols that aren't dollar signs, deleted with str.translate
+_SYMBOLS = str.maketrans("", "", "+=*/\\[]{}^_")
+
+_DIGIT = re.compile(r'\d')
+# "spending 20" -> "spending $20" (also covers "<Merchant> for 20")
+_VERB_AMOUNT = re.compile(r'\b(spending|spent|cost|costs|total of|for)\s+(\d+)\b', re.IGNORECASE)
+# "20 dollars" -> "$20"
+_DOLLARS_WORD = re.compile(r'\b(\d+)\s*dollars?\b', re.IGNORECASE)
+# Standalone numbers that are likely money amounts (10-9999 range)
+_PREPOSITION_AMOUNT = re.compile(
+    r'\b(at|for|of)\s+(\d{2,4})\b(?!\s*(?:years?|months?|days?|times?|percent|%|people|items?))',
+    re.IGNORECASE,
+)
+# "total 150" -> "total $150"
+_TOTAL_AMOUNT = re.compile(r'\b(total|totaling)\s+(\d+)\b', re.IGNORECASE)
+# Numbers in spending contexts without prepositions: "20 on coffee", "20 at Target"
+_CONTEXT_AMOUNT = re.compile(r'\b(\d{2,4})\s+(on\s+[a-z]+|at\s+[A-Z])')
+
+# Recently produced outputs; seeing one again means the text is already clean
+_CLEANED_LIMIT = 2048
+_cleaned = OrderedDict()
+_cleaned_lock = threading.Lock()
+
+
+def clean_text(text):
+    """Remove LaTeX formatting and mathematical symbols from text, format financial amounts"""
+    if not text:
+        return text
+    with _cleaned_lock:
+        if text in _cleaned:
+            # Cleaning isn't idempotent ("$20 on x" would gain another "$"), so never re-clean
+            _cleaned.move_to_end(text)
+            return text
+
+    cleaned = _clean(text)
+
+    with _cleaned_lock:
+        _cleaned[cleaned] = None
+        if len(_cleaned) > _CLEANED_LIMIT:
+            _cleaned.popitem(last=False)
+    return cleaned
+
+
+def _clean(text):
+    # Each pass only runs when its trigger characters are present
+    if '$' in text:
+        text = _DISPLAY_MATH.sub('', text)
+        text = _INLINE_MATH.sub('', text)
+    if '\\' in text:
+        text = _COMMAND_WITH_ARG.sub('', text)
+        text = _COMMAND.sub('', text)
+    text = text.translate(_SYMBOLS)
+
+    # Collapse whitespace (same whitespace set as re's \s)
+    text = " ".join(text.split())
+
+    if not _DIGIT.search(text):
+        return text
+    text = _VERB_AMOUNT.sub(r'\1 $\2', text)
+    if 'dollar' in text.lower():
+        text = _DOLLARS_WORD.sub(r'$\1', text)
+    text = _PREPOSITION_AMOUNT.sub(r'\1 $\2', text)
+    text = _TOTAL_AMOUNT.sub(r'\1 $\2', text)
+    text = _CONTEXT_AMOUNT.sub(r'$\1 \2', text)
+    return text
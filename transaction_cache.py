@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+load_dotenv()
+
+# --- Config (overridable through .env) ---
+CACHE_TTL = float(os.getenv("TRANSACTION_CACHE_TTL", "300"))  # seconds
+CACHE_MAX_ENTRIES = int(os.getenv("TRANSACTION_CACHE_MAX_ENTRIES", "256"))
+CACHE_MAX_BYTES = int(os.getenv("TRANSACTION_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def estimate_size(value):
+    """Rough in-memory size of a cached value (TransactionTable or list of dicts)"""
+    if hasattr(value, "nbytes"):
+        return value.nbytes
+    size = sys.getsizeof(value)
+    for item in value:
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in item.items())
+    return size
+
+
+class TransactionCache:
+    """Thread-safe TTL + LRU cache with single-flight loading"""
+
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES,
+                 sizeof=estimate_size):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._inflight = {}            # key -> Event for loads currently running
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+                       "loads": 0, "load_errors": 0, "coalesced": 0}
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader() at most once per miss"""
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    value, expires_at, _ = entry
+                    if expires_at > time.monotonic():
+                        self._entries.move_to_end(key)
+                        self._stats["hits"] += 1
+                        return value
+                    self._remove(key)
+                    self._stats["expirations"] += 1
+
+                event = self._inflight.get(key)
+                if event is None:
+                    # This caller owns the load; everyone else waits on the event
+                    event = threading.Event()
+                    self._inflight[key] = event
+                    self._stats["misses"] += 1
+                    break
+                self._stats["coalesced"] += 1
+            event.wait()
+            # Loop back: either the value is now cached, or the load failed and we retry
+
+        try:
+            value = loader()
+        except Exception:
+            with self._lock:
+                self._stats["load_errors"] += 1
+            raise
+        else:
+            self.put(key, value)
+            with self._lock:
+                self._stats["loads"] += 1
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            self._evict()
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            elif key in self._entries:
+                self._remove(key)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            return stats
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        # Least recently used entries go first; always keep the newest one
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+
+# Module-level instance is shared by every Streamlit session in this process
+TRANSACTIONS = TransactionCache()
+
+
+def cache_stats():
+    """Hit/miss/eviction counters for monitoring"""
+    return TRANSACTIONS.stats()
@@ -0,0 +1,162 @@
+import numpy as np
+from categorizer import CATEGORIZER
+
+
+def _encode(values):
+    """Dictionary-encode values into (int32 codes, object array of distinct values); None -> -1"""
+    lookup = {}
+    codes = np.fromiter(
+        (-1 if v is None else lookup.setdefault(v, len(lookup)) for v in values),
+        dtype=np.int32, count=len(values),
+    )
+    dictionary = np.empty(len(lookup), dtype=object)
+    dictionary[:] = list(lookup)
+    return codes, dictionary
+
+
+def _parse_dates(date_strs):
+    try:
+        return np.array(date_strs, dtype="datetime64[D]").astype("datetime64[ns]")
+    except (ValueError, TypeError):
+        # Malformed dates become NaT instead of failing the whole table
+        parsed = np.empty(len(date_strs), dtype="datetime64[ns]")
+        for i, value in enumerate(date_strs):
+            try:
+                parsed[i] = np.datetime64(value, "D")
+            except (ValueError, TypeError):
+                parsed[i] = np.datetime64("NaT")
+        return parsed
+
+
+def _categorize_codes(categorizer, description_codes, descriptions, merchant_codes, merchants):
+    """Categorize each distinct description (or description/merchant pair) once"""
+    if not categorizer.merchants:
+        category_codes, categories = _encode(categorizer.categorize_many(descriptions))
+        return category_codes[description_codes], categories
+
+    # Merchant overrides make the category depend on the (description, merchant) pair
+    stride = len(merchants) + 1
+    pair_keys = description_codes.astype(np.int64) * stride + merchant_codes + 1
+    unique_keys, inverse = np.unique(pair_keys, return_inverse=True)
+    labels = [
+        categorizer.categorize(descriptions[key // stride], merchants[key % stride - 1] if key % stride else None)
+        for key in unique_keys.tolist()
+    ]
+    category_codes, categories = _encode(labels)
+    return category_codes[inverse], categories
+
+
+class TransactionTable:
+    """Columnar, typed view of an account's purchases, built once at ingest"""
+
+    def __init__(self, ids, dates, amounts, description_codes, descriptions,
+                 category_codes, categories, merchant_codes, merchants):
+        self.ids = ids                              # object array of purchase _ids
+        self.dates = dates                          # datetime64[ns]
+        self.amounts = amounts                      # float64
+        self.description_codes = description_codes  # int32 codes into descriptions
+        self.descriptions = descriptions            # distinct descriptions
+        self.category_codes = category_codes        # int32 codes into categories
+        self.categories = categories                # distinct categories
+        self.merchant_codes = merchant_codes        # int32 codes into merchants
+        self.merchants = merchants                  # distinct merchant ids
+
+    @classmethod
+    def from_columns(cls, ids, purchase_dates, amounts, descriptions, merchant_ids, categorizer=CATEGORIZER):
+        """Build a table from parallel column lists (e.g. straight from SQL)"""
+        description_codes, description_values = _encode([d or "" for d in descriptions])
+        merchant_codes, merchants = _encode(list(merchant_ids))
+        category_codes, categories = _categorize_codes(
+            categorizer, description_codes, description_values, merchant_codes, merchants
+        )
+        id_array = np.empty(len(ids), dtype=object)
+        id_array[:] = list(ids)
+        return cls(
+            ids=id_array,
+            dates=_parse_dates(list(purchase_dates)),
+            amounts=np.array([a or 0.0 for a in amounts], dtype=np.float64),
+            description_codes=description_codes,
+            descriptions=description_values,
+            category_codes=category_codes,
+            categories=categories,
+            merchant_codes=merchant_codes,
+            merchants=merchants,
+        )
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a table from Nessie purchase dicts"""
+        return cls.from_columns(
+            [r.get("_id") for r in records],
+            [r.get("purchase_date") for r in records],
+            [r.get("amount", 0) for r in records],
+            [r.get("description", "") for r in records],
+            [r.get("merchant_id") for r in records],
+        )
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @property
+    def nbytes(self):
+        return sum(
+            column.nbytes for column in (
+                self.ids, self.dates, self.amounts, self.description_codes, self.descriptions,
+                self.category_codes, self.categories, self.merchant_codes, self.merchants,
+            )
+        )
+
+    def category_column(self):
+        """Decoded category per row"""
+        return self.categories[self.category_codes]
+
+    def description_column(self):
+        """Decoded description per row"""
+        return self.descriptions[self.description_codes]
+
+    def take(self, indexer):
+        """Row subset by boolean mask or integer indexes; dictionaries are shared"""
+        return TransactionTable(
+            ids=self.ids[indexer],
+            dates=self.dates[indexer],
+            amounts=self.amounts[indexer],
+            description_codes=self.description_codes[indexer],
+            descriptions=self.descriptions,
+            category_codes=self.category_codes[indexer],
+            categories=self.categories,
+            merchant_codes=self.merchant_codes[indexer],
+            merchants=self.merchants,
+        )
+
+    def to_pandas(self):
+        """DataFrame over the same buffers; categorical columns reuse the codes"""
+        import pandas as pd
+        return pd.DataFrame({
+            "_id": self.ids,
+            "date": self.dates,
+            "amount": self.amounts,
+            "description": pd.Categorical.from_codes(self.description_codes, self.descriptions),
+            "category": pd.Categorical.from_codes(self.category_codes, self.categories),
+            "merchant_id": pd.Categorical.from_codes(self.merchant_codes, self.merchants),
+        }, copy=False)
+
+    def to_records(self):
+        """Plain dicts of the table's own columns (_id, purchase_date, amount, description, merchant_id)
+
+        Not the full Nessie purchase: type, medium, payer_id, status... aren't kept in the table.
+        Use get_transactions.fetch_trans or PurchaseStore.read_purchases for those.
+        """
+        dates = np.datetime_as_string(self.dates, unit="D").tolist()
+        return [
+            {
+                "_id": purchase_id,
+                "purchase_date": date if date != "NaT" else None,
+                "amount": amount,
+                "description": self.descriptions[description_code],
+                "merchant_id": self.merchants[merchant_code] if merchant_code >= 0 else None,
+            }
+            for purchase_id, date, amount, description_code, merchant_code in zip(
+                self.ids.tolist(), dates, self.amounts.tolist(),
+                self.description_codes.tolist(), self.merchant_codes.tolist(),
+            )
+        ]
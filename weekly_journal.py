@@ -0,0 +1,145 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+from text_cleaning import clean_text
+from llm_cache import get_cache, content_key
+from instrumentation import timed
+load_dotenv()
+
+# Cap on concurrent Gemini requests while generating one journal
+JOURNAL_MAX_WORKERS = int(os.getenv("JOURNAL_MAX_WORKERS", "4"))
+
+# Weeks shown on the dashboard journal, newest first
+JOURNAL_WEEKS = 4
+
+# Everything that changes the model output is part of the cache key;
+# bump PROMPT_VERSION whenever the prompt text or response parsing changes
+PROMPT_VERSION = 2
+JOURNAL_TEMPERATURE = 0.7
+JOURNAL_THINKING_BUDGET = 0  # no thinking: it would eat the 200-token reply budget
+
+
+def build_journal_prompt(week_stats, week_transactions, week_start, week_end):
+    """Persona/story prompt for one week"""
+    return f"""
+You are a creative financial storyteller who turns spending data into engaging weekly personas and narratives.
+
+WEEK DATA ({week_start} to {week_end}):
+- Total spent: ${week_stats['total']}
+- Transaction count: {week_stats['transaction_count']}
+- Category breakdown: {week_stats['categories']}
+- Transactions (id, date, amount, description, merchant): {json.dumps(week_transactions, indent=2)}
+
+TASK: Create a weekly financial persona and story with these exact components:
+
+1. PERSONA_NAME: A creative 2-3 word persona based on spending patterns (examples: "Foodie Adventurer", "Thrifty Saver", "Generous Giver", "Coffee Connoisseur", "Utility Warrior", "Shopping Explorer")
+
+2. EMOJI: A single emoji that represents the persona (🍕🛡️💝☕🏠🛍️ etc.)
+
+3. STORY: A 2-3 sentence engaging narrative that:
+- Tells their spending like a story with personality
+- Mentions specific amounts and interesting patterns
+- Includes a friendly tip or insight for next week
+- Keeps it fun and relatable, not judgmental
+
+FORMAT YOUR RESPONSE EXACTLY LIKE THIS:
+PERSONA_NAME: [persona name]
+EMOJI: [single emoji]
+STORY: [2-3 sentence story with amounts and tip]
+
+STYLE GUIDELINES:
+- CRITICAL: Use only plain text. NO LaTeX, NO math symbols, NO equations, NO code formatting
+- ALWAYS write financial amounts with dollar signs: "$65", "$150", "$20" - NEVER write bare numbers like "65" or "150" when referring to money
+- Every money amount must have a $ symbol: "spent $50 at Starbucks", "total of $200 on groceries"
+- Never use mathematical symbols like +, =, *, /, or parentheses for calculations
+- Don't show math work or breakdowns - just state the final amounts with $ signs
+- Use simple, conversational language like you're texting a friend
+- Be encouraging and fun, not preachy
+- Focus on the most interesting spending patterns
+- Include specific merchants or categories when relevant
+- End with a forward-looking tip or encouragement
+
+If there are no transactions for the week, create a "Financial Hermit 🏠" persona with a story about staying in and saving money.
+
+IMPORTANT: Your response must be readable as plain text in a messaging app. No formatting, no equations, no symbols except basic punctuation and dollar signs.
+"""
+
+
+@timed("journal.week")
+def generate_persona_and_story(provider, week_stats, week_transactions, week_start, week_end, use_cache=True):
+    """Generate a financial persona and weekly story with the configured LLM provider"""
+    
+    # Closed weeks never change, so their stories are generated once and reused from disk
+    cache_key = content_key(
+        PROMPT_VERSION, provider.name, provider.model, JOURNAL_TEMPERATURE, JOURNAL_THINKING_BUDGET,
+        week_start, week_end, week_stats, week_transactions,
+    )
+    if use_cache:
+        cached = get_cache().get(cache_key)
+        if cached is not None:
+            return cached["persona_name"], cached["emoji"], cached["story"]
+    
+    # Create the prompt for persona and story generation
+    prompt = build_journal_prompt(week_stats, week_transactions, week_start, week_end)
+
+    try:
+        response_text = provider.generate(
+            prompt, temperature=JOURNAL_TEMPERATURE, max_output_tokens=200, thinking_budget=JOURNAL_THINKING_BUDGET
+        )
+        
+        # Parse the response
+        response_text = response_text.strip()
+        lines = response_text.split('\n')
+        
+        persona_name = None
+        emoji = "📊"
+        story = None
+        
+        for line in lines:
+            if line.startswith("PERSONA_NAME:"):
+                persona_name = clean_text(line.replace("PERSONA_NAME:", "").strip()) or None
+            elif line.startswith("EMOJI:"):
+                emoji = line.replace("EMOJI:", "").strip() or emoji  # Don't clean emojis
+            elif line.startswith("STORY:"):
+                story = clean_text(line.replace("STORY:", "").strip()) or None
+        
+        # Only a complete reply is cached; a cut-off or malformed one gets the defaults
+        # for now and is asked for again next time
+        if persona_name is None or story is None:
+            return persona_name or "Financial Explorer", emoji, story or "Had an interesting week with your finances!"
+        if use_cache:
+            get_cache().put(cache_key, {"persona_name": persona_name, "emoji": emoji, "story": story})
+        return persona_name, emoji, story
+        
+    except Exception:
+        # Fallback persona if AI fails
+        return "Financial Explorer", "📊", f"This week you spent ${week_stats['total']:.0f} across {week_stats['transaction_count']} transactions. Keep up the tracking!"
+
+
+def generate_journal_entries(provider, weeks, max_workers=JOURNAL_MAX_WORKERS, use_cache=True):
+    """Generate every week's story concurrently, yielding entries as each one completes"""
+    if not weeks:
+        return
+
+    def generate(i, week):
+        # Only the table's columns go into the prompt (see TransactionTable.to_records);
+        # the other Nessie fields say nothing about the week's spending
+        persona_name, emoji, story = generate_persona_and_story(
+            provider, week["stats"], week["table"].to_records(), week["week_start"], week["week_end"], use_cache
+        )
+        return {
+            "week_index": i + 1,
+            "week_start": week["week_start"],
+            "week_end": week["week_end"],
+            "persona_name": persona_name,
+            "emoji": emoji,
+            "story": story,
+            "stats": week["stats"],
+        }
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(weeks)))) as pool:
+        futures = [pool.submit(generate, i, week) for i, week in enumerate(weeks)]
+        for future in as_completed(futures):
+            # generate_persona_and_story already falls back on model errors
+            yield future.result()
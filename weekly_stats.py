@@ -0,0 +1,64 @@
+from datetime import timedelta
+import numpy as np
+
+def _bucket_weeks(table):
+    """Assign every dated row to its Monday week start in one vectorized pass"""
+    rows = np.flatnonzero(~np.isnat(table.dates))  # skip malformed dates
+    days = table.dates[rows].astype("datetime64[D]").astype(np.int64)
+    # 1970-01-01 was a Thursday, so (days + 3) % 7 is the weekday with Monday = 0
+    week_days = days - (days + 3) % 7
+    weeks, week_index = np.unique(week_days, return_inverse=True)
+    return rows, weeks, week_index
+
+
+def _stats_by_week(table, rows, weeks, week_index):
+    """Totals, counts and per-category sums for all weeks, via bincount"""
+    amounts = table.amounts[rows]
+    n_weeks = len(weeks)
+    n_categories = len(table.categories)
+    totals = np.bincount(week_index, weights=amounts, minlength=n_weeks)
+    counts = np.bincount(week_index, minlength=n_weeks)
+
+    cells = week_index * n_categories + table.category_codes[rows]
+    category_sums = np.bincount(cells, weights=amounts, minlength=n_weeks * n_categories)
+    category_counts = np.bincount(cells, minlength=n_weeks * n_categories)
+    category_sums = category_sums.reshape(n_weeks, n_categories)
+    category_counts = category_counts.reshape(n_weeks, n_categories)
+
+    stats = []
+    for w in range(n_weeks):
+        present = np.flatnonzero(category_counts[w])
+        stats.append({
+            "total": float(totals[w]),
+            "categories": {table.categories[c]: float(category_sums[w, c]) for c in present},
+            "transaction_count": int(counts[w]),
+        })
+    return stats
+
+
+def _to_date(week_day):
+    return np.datetime64(int(week_day), "D").astype(object)
+
+
+def weekly_stats(table):
+    """Stats dict for every week, keyed by week start (Monday) date"""
+    rows, weeks, week_index = _bucket_weeks(table)
+    stats = _stats_by_week(table, rows, weeks, week_index)
+    return {_to_date(week): week_stats for week, week_stats in zip(weeks, stats)}
+
+
+def recent_weeks(table, count=4):
+    """The most recent weeks, newest first, as dicts with week_start/week_end/table/stats"""
+    rows, weeks, week_index = _bucket_weeks(table)
+    stats = _stats_by_week(table, rows, weeks, week_index)
+
+    recent = []
+    for w in range(len(weeks) - 1, max(len(weeks) - count, 0) - 1, -1):
+        week_start = _to_date(weeks[w])
+        recent.append({
+            "week_start": week_start,
+            "week_end": week_start + timedelta(days=6),
+            "table": table.take(rows[week_index == w]),
+            "stats": stats[w],
+        })
+    return recent